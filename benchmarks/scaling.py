@@ -0,0 +1,164 @@
+"""
+Scaling benchmark of the Railroad Optimization Problem - ROP: sweeps terminals, trains and flow density
+of instances from optimization_intances.instances_creator and records, for each phase, its time and
+peak traced memory, as reported by an optimizer.instrumentation.Profiler:
+
+    restriction build   every restriction family (RailroadOptimizationProblem.build_families)
+    model assembly      the sparse model matrix (ModelMatrix.from_restrictions)
+    solve               the backend build and run, with the nonzero count of the model
+    report              RailroadResult and its accepted volume, empty offer and utilization reports
+
+Results are written as JSON or CSV (by the output suffix), one record per case, so runs can be compared.
+
+    python -m benchmarks.scaling --nodes 5 10 20 --trains 10 40 --density 0.3 1 --output scaling.json
+"""
+import argparse
+import csv
+import itertools
+import json
+import time
+from dataclasses import dataclass, asdict, fields
+from pathlib import Path
+from typing import Iterator, Optional
+from optimization_intances.instances_creator import build_instance
+from optimizer.instrumentation import Profiler
+from optimizer.optimization_model import RailroadOptimizationProblem
+from optimizer.solvers.solver_backend import SolverBackend
+from optimizer.solvers.highs_backend import HighsBackend
+
+
+@dataclass
+class BenchmarkCase:
+    nodes: int
+    trains: int
+    density: float
+    seed: int = 0
+
+    @property
+    def degree(self) -> Optional[int]:
+        """
+        Destinations by origin, None for all pairs
+        """
+        if self.density >= 1:
+            return None
+        return max(1, round(self.density * (self.nodes - 1)))
+
+
+@dataclass
+class BenchmarkRecord:
+    nodes: int
+    trains: int
+    density: float
+    seed: int
+    flows: int = 0
+    variables: int = 0
+    constraints: int = 0
+    nonzeros: int = 0
+    problem_build_time: float = 0.0
+    restriction_build_time: float = 0.0
+    restriction_build_memory: int = 0
+    assembly_time: float = 0.0
+    assembly_memory: int = 0
+    status: Optional[str] = None
+    objective: Optional[float] = None
+    model_build_time: float = 0.0
+    solve_time: float = 0.0
+    solve_memory: int = 0
+    report_time: float = 0.0
+    report_memory: int = 0
+
+
+def run_case(
+        case: BenchmarkCase,
+        max_time: float,
+        backend: SolverBackend = None,
+        solve: bool = True,
+        memory: bool = True
+) -> BenchmarkRecord:
+    """
+    Builds, solves and reports one case, reading the phases from a Profiler given to the problem
+    :param memory: trace the peak memory of each phase, which slows them down
+    """
+    backend = backend or HighsBackend(verbose=False)
+    record = BenchmarkRecord(nodes=case.nodes, trains=case.trains, density=case.density, seed=case.seed)
+    instance = build_instance(terminals=case.nodes, trains=case.trains, degree=case.degree, seed=case.seed)
+    record.flows = len(instance["demands"])
+
+    profiler = Profiler(trace_memory=memory)
+    start = time.perf_counter()
+    problem = RailroadOptimizationProblem(**instance, observer=profiler)
+    model = problem.model_matrix        # assembled when first read
+    record.problem_build_time = time.perf_counter() - start
+    restrictions, assembly = profiler.total("restrictions."), profiler.total("model.assembly")
+    record.restriction_build_time, record.restriction_build_memory = restrictions.wall_time, restrictions.peak_memory
+    record.assembly_time, record.assembly_memory = assembly.wall_time, assembly.peak_memory
+    record.variables, record.constraints, record.nonzeros = model.variables, model.constraints, model.nonzeros
+    if not solve:
+        return record
+
+    result = problem.optimize(max_time=max_time, backend=backend)
+    outcome = problem.outcome
+    record.status = outcome.status.value
+    record.objective = outcome.objective
+    build, run = profiler.total("solve.build"), profiler.total("solve.run")
+    record.model_build_time = build.wall_time
+    record.solve_time = run.wall_time
+    record.solve_memory = max(build.peak_memory, run.peak_memory)
+    if result is not None:
+        result.accpt_volume(verbose=False)
+        result.empty_offer()
+        result.train_utilization(total_time=problem.horizon)
+        build, reports = profiler.total("result."), profiler.total("report.")
+        record.report_time = build.wall_time + reports.wall_time
+        record.report_memory = max(build.peak_memory, reports.peak_memory)
+    return record
+
+
+def sweep(nodes: list[int], trains: list[int], densities: list[float], seeds: list[int]) -> Iterator[BenchmarkCase]:
+    for n, t, d, s in itertools.product(nodes, trains, densities, seeds):
+        yield BenchmarkCase(nodes=n, trains=t, density=d, seed=s)
+
+
+def write_records(records: list[BenchmarkRecord], output):
+    """
+    Writes CSV when `output` ends in .csv, JSON otherwise
+    """
+    output = Path(output)
+    rows = [asdict(record) for record in records]
+    if output.suffix == ".csv":
+        with open(output, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=[f.name for f in fields(BenchmarkRecord)])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(output, "w") as file:
+            json.dump(rows, file, indent=2)
+
+
+def main(arguments: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--trains", type=int, nargs="+", default=[10, 40])
+    parser.add_argument("--density", type=float, nargs="+", default=[0.3, 1.0],
+                        help="share of the destinations of each origin with a flow, 1 for all pairs")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--max-time", type=float, default=10, help="solver time limit by case, in seconds")
+    parser.add_argument("--no-solve", action="store_true", help="only build and assemble the models")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc, which slows the phases")
+    parser.add_argument("--output", default="scaling.json", help=".json or .csv")
+    options = parser.parse_args(arguments)
+
+    records = []
+    for case in sweep(options.nodes, options.trains, options.density, options.seeds):
+        record = run_case(case, max_time=options.max_time, solve=not options.no_solve, memory=not options.no_memory)
+        records.append(record)
+        print(
+            f"nodes={record.nodes} trains={record.trains} density={record.density} "
+            f"nnz={record.nonzeros} restrictions={record.restriction_build_time:.3f}s "
+            f"assembly={record.assembly_time:.3f}s solve={record.solve_time:.3f}s report={record.report_time:.3f}s"
+        )
+        write_records(records, options.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,83 +1,137 @@
-import random
+"""
+Random instances of the Railroad Optimization Problem - ROP.
 
+Every value is drawn, in vectorised form, from a single numpy.random.Generator: the `rng` argument of each
+builder, or the module `generator` seeded with `seed_value`. The same seed and calls always give the same
+instance. `build_instance` creates all-pairs networks, or sparse ones with `degree` destinations by origin,
+of thousands of terminals.
+"""
 import numpy as np
 
 from optimizer.restrictions.railroad_elements import Node, Flow, TransitTime, Demand
 
 seed_value = 45
-random.seed(seed_value)
+generator = np.random.default_rng(seed_value)
 
 
-def build_nodes(amount=2, capacity_interval=(500, 800)):
-    capacities = [random.randint(*capacity_interval) for _ in range(amount)]
+def build_nodes(amount=2, capacity_interval=(500, 800), rng: np.random.Generator = None):
+    rng = generator if rng is None else rng
+    capacities = rng.integers(int(capacity_interval[0]), int(capacity_interval[1]), size=amount, endpoint=True)
     nodes = [
         Node(name=f"terminal_{i}", capacity=c)
-        for i, c in enumerate(capacities)
+        for i, c in enumerate(capacities.tolist())
     ]
     return nodes
 
-def build_terminals_and_ports(terminals=1, ports=1, capacity_interval=(500, 800)):
-    capacities = [random.randint(*capacity_interval) for _ in range(terminals)]
-    terminals = [
-        Node(name=f"terminal_{i}", capacity=c)
-        for i, c in enumerate(capacities)
-    ]
-    capacities = [random.randint(*capacity_interval) for _ in range(ports)]
+
+def build_terminals_and_ports(terminals=1, ports=1, capacity_interval=(500, 800), rng: np.random.Generator = None):
+    rng = generator if rng is None else rng
+    terminals = build_nodes(amount=terminals, capacity_interval=capacity_interval, rng=rng)
+    capacities = rng.integers(int(capacity_interval[0]), int(capacity_interval[1]), size=ports, endpoint=True)
     ports = [
         Node(name=f"port_{i}", capacity=c)
-        for i, c in enumerate(capacities)
+        for i, c in enumerate(capacities.tolist())
     ]
     return terminals
 
-def build_flows(nodes: list[Node], train_capacity_interval: tuple=(5e3, 8e3)):
-    flows = []
-    for origin in nodes:
-        for destination in nodes:
-            if origin == destination:
-                continue
-            flow = Flow(
-                origin=origin,
-                destination=destination,
-                train_volume=random.randint(*train_capacity_interval)
-            )
-            flows.append(flow)
-    return flows
 
+def build_flows(
+        nodes: list[Node],
+        train_capacity_interval: tuple = (5e3, 8e3),
+        degree: int = None,
+        rng: np.random.Generator = None
+):
+    """
+    :param degree: destinations by origin, drawn at random (duplicates dropped, so up to `degree`).
+        When None every ordered pair of distinct nodes is a flow. Fewer than two nodes give no flows.
+    """
+    rng = generator if rng is None else rng
+    amount = len(nodes)
+    if amount < 2:
+        origins = destinations = np.zeros(0, dtype=np.int64)
+    elif degree is None:
+        origins, destinations = np.nonzero(~np.eye(amount, dtype=bool))
+    else:
+        origins = np.repeat(np.arange(amount), degree)
+        destinations = (origins + rng.integers(1, amount, size=len(origins))) % amount
+        pairs = np.unique(origins * amount + destinations)
+        origins, destinations = np.divmod(pairs, amount)
+    volumes = rng.integers(
+        int(train_capacity_interval[0]), int(train_capacity_interval[1]), size=len(origins), endpoint=True
+    )
+    flows = [
+        Flow(origin=nodes[o], destination=nodes[d], train_volume=v)
+        for o, d, v in zip(origins.tolist(), destinations.tolist(), volumes.tolist())
+    ]
+    return flows
 
-def build_transits(flows: list[Flow], transit_interval=(2, 5)):
-    transits = []
 
-    for i, flow in enumerate(flows):
-        transit = TransitTime(
-            origin=flow.origin,
-            destination=flow.destination,
-            time=round(random.uniform(*transit_interval), 2)
-        )
-        transits.append(transit)
+def build_transits(flows: list[Flow], transit_interval=(2, 5), rng: np.random.Generator = None):
+    rng = generator if rng is None else rng
+    times = np.round(rng.uniform(*transit_interval, size=len(flows)), 2)
+    transits = [
+        TransitTime(origin=flow.origin, destination=flow.destination, time=time)
+        for flow, time in zip(flows, times.tolist())
+    ]
     return transits
 
 
-def build_demands(flows: list[Flow], demand_interval=(20e3, 50e3), with_minimum=.2):
-    demands = []
-    flows_with_minimum = np.floor(len(flows)*with_minimum)
+def build_demands(
+        flows: list[Flow],
+        demand_interval=(20e3, 50e3),
+        with_minimum=.2,
+        rng: np.random.Generator = None
+):
+    rng = generator if rng is None else rng
+    drawn = rng.uniform(*demand_interval, size=len(flows))
+    volumes = np.array([flow.train_volume for flow in flows], dtype=float)
+    capacities = np.array([flow.origin.capacity for flow in flows], dtype=float)
+    # at least one train should be used in the first flows
+    with_minimum = np.arange(len(flows)) < np.floor(len(flows) * with_minimum)
+    swap = with_minimum & (drawn < volumes)
+    minimum = np.where(swap, drawn, volumes)
+    maximum = np.where(swap, volumes, drawn)
+    minimum = np.where(capacities < minimum, capacities * 0.1, minimum)
+    minimum = np.where(with_minimum, minimum, 0)
+    demands = [
+        Demand(flow=flow, minimum=low, maximum=high)
+        for flow, low, high in zip(flows, minimum.tolist(), maximum.tolist())
+    ]
+    return demands
 
-    for i, flow in enumerate(flows):
-        maximum = np.random.uniform(*demand_interval)
-        minimum = flow.train_volume  # at least one train should be used in this flow
-        if i < flows_with_minimum:
 
-            if maximum < minimum:
-                aux = maximum
-                maximum = minimum
-                minimum = aux
-            if flow.origin.capacity < minimum:
-                minimum = flow.origin.capacity * 0.1
-        else:
-            minimum=0
-        transit = Demand(
-            flow=flow,
-            minimum=minimum,
-            maximum=maximum
-        )
-        demands.append(transit)
-    return demands
+def build_instance(
+        terminals: int,
+        trains: int,
+        time_horizon: int = 90,
+        degree: int = None,
+        seed: int = seed_value,
+        capacity_interval=(30 * 8e3, 5 * 30 * 8e3),
+        train_capacity_interval=(4e3, 8e3),
+        demand_interval=(10e3, 500e3),
+        transit_interval=(1, 2),
+        with_minimum=.2,
+        initial_trains: bool = True
+) -> dict:
+    """
+    Random instance drawn from its own generator seeded with `seed`
+    :param degree: destinations by origin of a sparse network, all pairs when None
+    :param initial_trains: spread the trains at random over the terminals as initial positions
+    :return: the RailroadOptimizationProblem arguments
+    """
+    if terminals < 2:
+        raise ValueError(f"An instance needs at least 2 terminals to have flows, got {terminals}")
+    rng = np.random.default_rng(seed)
+    nodes = build_nodes(amount=terminals, capacity_interval=capacity_interval, rng=rng)
+    if initial_trains:
+        counts = np.bincount(rng.integers(0, terminals, size=trains), minlength=terminals)
+        for node, count in zip(nodes, counts.tolist()):
+            node.initial_trains = count
+    flows = build_flows(nodes=nodes, train_capacity_interval=train_capacity_interval, degree=degree, rng=rng)
+    return dict(
+        trains=trains,
+        demands=build_demands(flows=flows, demand_interval=demand_interval, with_minimum=with_minimum, rng=rng),
+        transit_times=build_transits(flows=flows, transit_interval=transit_interval, rng=rng),
+        exchange_bands=[],
+        time_horizon=time_horizon
+    )
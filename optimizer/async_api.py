@@ -0,0 +1,146 @@
+"""
+This file implements the asyncio entry point of the Railroad Optimization Problem - ROP.
+
+    result = await optimize_async(problem, max_time=600)
+
+The build and solve of `optimize` run in a thread pool shared by every solve of the process - bounded by
+`configure_executor`, the number of CPUs by default - so the event loop is never blocked and concurrent
+requests queue instead of oversubscribing the cores. `problem` may also be a factory, so the restriction
+build runs off the loop as well.
+
+Cancellation is cooperative: AsyncSolve.cancel() asks the solver to stop at its next progress event, and
+the awaited result is the best incumbent found so far. Cancelling the awaiting task does the same and then
+raises CancelledError, the incumbent staying in `problem.outcome`. How early the solve stops depends on
+the `mode` option of `optimize`:
+
+    EXACT               only backends with solver callbacks (Gurobi) stop early; the others finish at their
+                        time limit
+    COLUMN_GENERATION   pricing stops after the current round and the integer master is solved over the
+                        patterns generated so far
+    RELAX_AND_ROUND     not stopped, it runs a single relaxation
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Executor
+from typing import Callable, Optional, Union
+from optimizer.optimization_model import RailroadOptimizationProblem, RailroadResult
+from optimizer.solvers.solver_backend import SolverBackend, SolverProgress, ProgressCallback
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def configure_executor(max_workers: int = None) -> ThreadPoolExecutor:
+    """
+    Replaces the shared executor; solves already queued in the previous one still run
+    :param max_workers: concurrent solves, the number of CPUs when None
+    :return:
+    """
+    global _executor
+    with _executor_lock:
+        previous = _executor
+        _executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count(), thread_name_prefix="rop-solve")
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _executor
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    with _executor_lock:
+        executor = _executor
+    return executor if executor is not None else configure_executor()
+
+
+class AsyncSolve:
+    def __init__(
+            self,
+            problem: Union[RailroadOptimizationProblem, Callable[[], RailroadOptimizationProblem]],
+            max_time: float,
+            backend: SolverBackend = None,
+            executor: Executor = None,
+            progress: ProgressCallback = None,
+            **options
+    ):
+        """
+        :param problem: the problem, or a factory called in the executor
+        :param executor: runs the build and solve, the shared executor when None
+        :param progress: see SolverBackend.run; called from the solving thread
+        :param options: further RailroadOptimizationProblem.optimize arguments, e.g. warm_start
+        """
+        self.problem = problem
+        self.max_time = max_time
+        self.backend = backend
+        self.executor = executor
+        self.progress = progress
+        self.options = options
+        self.__stop = threading.Event()
+        self.__future: Optional[asyncio.Future] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__stop.is_set()
+
+    def cancel(self):
+        """
+        Stops the solver at its next progress event, keeping the best incumbent
+        """
+        self.__stop.set()
+
+    def start(self) -> asyncio.Future:
+        """
+        Submits the solve to the executor, once
+        :return:
+        """
+        if self.__future is None:
+            loop = asyncio.get_running_loop()
+            self.__future = loop.run_in_executor(self.executor or shared_executor(), self.__solve)
+        return self.__future
+
+    def __await__(self):
+        return self.__wait().__await__()
+
+    async def __wait(self) -> Optional[RailroadResult]:
+        future = self.start()
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.cancel()
+            await asyncio.wait([future])
+            raise
+
+    def __solve(self) -> Optional[RailroadResult]:
+        if not isinstance(self.problem, RailroadOptimizationProblem):
+            self.problem = self.problem()
+        return self.problem.optimize(
+            max_time=self.max_time,
+            backend=self.backend,
+            progress=self.__on_progress,
+            **self.options
+        )
+
+    def __on_progress(self, progress: SolverProgress) -> bool:
+        stop = self.progress(progress) if self.progress is not None else False
+        return bool(stop) or self.__stop.is_set()
+
+
+async def optimize_async(
+        problem: Union[RailroadOptimizationProblem, Callable[[], RailroadOptimizationProblem]],
+        max_time: float,
+        backend: SolverBackend = None,
+        executor: Executor = None,
+        progress: ProgressCallback = None,
+        **options
+) -> Optional[RailroadResult]:
+    """
+    Awaitable RailroadOptimizationProblem.optimize, see AsyncSolve
+    :return: RailroadResult, or None when the solver found no solution
+    """
+    return await AsyncSolve(
+        problem=problem,
+        max_time=max_time,
+        backend=backend,
+        executor=executor,
+        progress=progress,
+        **options
+    )
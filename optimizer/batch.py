@@ -0,0 +1,122 @@
+"""
+This file implements the scenario batch runner: many Railroad Optimization Problems built and solved in
+a process pool within a budget of solver threads, so cores are not oversubscribed. The threads of a
+multithreaded backend (Gurobi) are divided among the workers; a single threaded one (HiGHS through scipy)
+runs at most one worker per thread of the budget.
+
+Each Scenario names a picklable factory - a module level function returning a RailroadOptimizationProblem,
+e.g. one that calls optimization_intances.instances_creator with a given seed - and its keyword arguments.
+"""
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+import numpy as np
+from optimizer.optimization_model import RailroadOptimizationProblem
+from optimizer.solvers.solver_backend import SolverBackend
+from optimizer.solvers.highs_backend import HighsBackend
+
+
+@dataclass
+class Scenario:
+    name: str
+    factory: Callable[..., RailroadOptimizationProblem]
+    kwargs: dict = field(default_factory=dict)
+
+
+@dataclass
+class ScenarioSummary:
+    name: str
+    status: Optional[str] = None
+    objective: Optional[float] = None
+    accepted_volume: Optional[float] = None
+    travels: Optional[float] = None
+    mean_train_utilization: Optional[float] = None
+    variables: Optional[int] = None
+    constraints: Optional[int] = None
+    problem_build_time: float = 0.0
+    model_build_time: float = 0.0
+    solve_time: float = 0.0
+    total_time: float = 0.0
+    error: Optional[str] = None
+
+
+def solve_scenario(scenario: Scenario, backend: SolverBackend, max_time: float) -> ScenarioSummary:
+    """
+    Builds and solves one scenario, capturing any error in the summary
+    :return:
+    """
+    summary = ScenarioSummary(name=scenario.name)
+    start = time.perf_counter()
+    try:
+        problem = scenario.factory(**scenario.kwargs)
+        summary.problem_build_time = time.perf_counter() - start
+        summary.variables = problem.model_matrix.variables
+        summary.constraints = problem.model_matrix.constraints
+
+        outcome = backend.solve(model=problem.model_matrix, max_time=max_time)
+        summary.status = outcome.status.value
+        summary.model_build_time = outcome.build_time
+        summary.solve_time = outcome.solve_time
+        if outcome.has_solution:
+            result = problem.build_result(values=outcome.values)
+            summary.objective = outcome.objective
+            summary.accepted_volume = float(result.accpt_volume(verbose=False)["accept volume"].sum())
+            summary.travels = float(np.sum(result.travels_by_train()))
+            summary.mean_train_utilization = float(np.mean(result.train_utilization(total_time=problem.horizon)))
+    except Exception as error:
+        summary.error = repr(error)
+    summary.total_time = time.perf_counter() - start
+    return summary
+
+
+def split_threads(
+        backend: SolverBackend,
+        scenarios: int,
+        workers: int = None,
+        total_threads: int = None
+) -> tuple[int, SolverBackend]:
+    """
+    Fits the workers and their solver threads to the thread budget, see run_scenarios
+    :return: pool size and a copy of `backend` configured for each worker
+    """
+    cores = os.cpu_count() or 1
+    workers = min(workers or cores, max(scenarios, 1))
+    total_threads = total_threads or cores
+    backend = copy.copy(backend)
+    if backend.multithreaded:
+        backend.threads = max(1, total_threads // workers)
+    else:
+        workers = min(workers, total_threads)
+    return workers, backend
+
+
+def run_scenarios(
+        scenarios: list[Scenario],
+        max_time: float,
+        backend: SolverBackend = None,
+        workers: int = None,
+        total_threads: int = None
+) -> Iterator[ScenarioSummary]:
+    """
+    Solves the scenarios in a process pool and yields each summary as soon as its scenario finishes
+    :param scenarios: instance definitions
+    :param max_time: solver time limit of each scenario, in seconds
+    :param backend: solver used by every worker (HiGHS by default)
+    :param workers: pool size, defaults to the number of cores
+    :param total_threads: solver threads shared by all workers, defaults to the number of cores
+    :return:
+    """
+    workers, backend = split_threads(
+        backend=backend or HighsBackend(verbose=False),
+        scenarios=len(scenarios),
+        workers=workers,
+        total_threads=total_threads
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(solve_scenario, scenario, backend, max_time) for scenario in scenarios]
+        for future in as_completed(futures):
+            yield future.result()
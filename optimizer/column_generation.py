@@ -0,0 +1,392 @@
+"""
+This file implements ColumnGeneration: a decomposition of the Railroad Optimization Problem - ROP - whose
+columns are trip patterns instead of the (n, i, j, k) tensor.
+
+A pattern is the trip count of one train over (i, j, k) whose cycle times (see CycleTimeTable) fit the time
+horizon. Interchangeable trains share their patterns (see optimizer.train_classes), so the master problem
+chooses how many trains of each class run each pattern under:
+
+    capacity, exchange, maximum and minimum demand, empty offer   over the trips of the whole fleet
+    pattern count = class size                                     for classes with initial position
+    pattern count <= class size                                    for the trains without initial position
+
+The patterns of a class with initial position depart from it at least once, so every train is dispatched.
+The master starts from the GreedyPlanner patterns and its relaxation prices new patterns with the duals:
+for each class, an integer knapsack over the cycle times with the reduced profit of each trip, solved by
+dynamic programming over the time horizon. When no pattern has positive reduced profit, the integer master
+over the generated patterns, started from the greedy patterns and given the time that pricing leaves, gives
+the plan; when it stops without one, the greedy patterns are kept if they satisfy every row. Rows that the
+initial patterns can not satisfy are covered by penalized artificial columns, and the trains without initial
+position may stay idle, so the master always has a column.
+
+The reported bound is the Lagrangian bound of the last master relaxation, priced with the cycle times
+rounded down to whole steps: a relaxation of the horizon, so it never falls below the optimum.
+"""
+import time
+from typing import TYPE_CHECKING
+import numpy as np
+from scipy import sparse
+from optimizer.model_matrix import ModelMatrix
+from optimizer.restrictions.railroad_elements import ProblemStructure
+from optimizer.restrictions.restrictions import RestrictionType
+from optimizer.restrictions.capacity_restriction import CapacityRestrictions
+from optimizer.restrictions.exchange_restriction import ExchangeRestriction
+from optimizer.restrictions.empty_offer_restriction import EmptyOfferRestriction
+from optimizer.restrictions.demand_restriction import MaximumDemandRestriction, MinimumDemandRestriction
+from optimizer.solvers.solver_backend import SolverBackend, SolverOutcome, SolverStatus, SolverProgress, \
+    ProgressCallback
+from optimizer.train_classes import build_train_classes
+from optimizer.heuristics import GreedyPlanner
+from optimizer.sparse_plan import SparsePlan
+
+if TYPE_CHECKING:
+    from optimizer.optimization_model import RailroadOptimizationProblem, RailroadResult
+
+
+class ColumnGeneration:
+    def __init__(
+            self,
+            problem: "RailroadOptimizationProblem",
+            backend: SolverBackend = None,
+            max_iterations: int = 100,
+            tolerance: float = 1e-6,
+            resolution: int = 1000,
+            master_share: float = 0.25
+    ):
+        """
+        :param problem: problem to decompose; its own model matrix is not used
+        :param backend: solves the master problem (HiGHS by default)
+        :param max_iterations: limit of pricing rounds
+        :param tolerance: smallest reduced profit of a new pattern
+        :param resolution: steps of the time horizon in the pricing knapsack; cycle times are rounded up to
+            whole steps, so patterns always fit the horizon
+        :param master_share: share of the time limit kept for the integer master; pricing stops before
+        """
+        if backend is None:
+            from optimizer.solvers.highs_backend import HighsBackend
+            backend = HighsBackend(verbose=False)
+        self.problem = problem
+        self.backend = backend
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.resolution = resolution
+        self.master_share = master_share
+
+        structure = problem.structure
+        self.classes = build_train_classes(trains=problem.trains, empty_origins=list(structure.empty_origins))
+        cycle_table = problem.cycle_table
+        self.__cycle_times = cycle_table.cycle_times.reshape(-1)
+        self.__cells = self.__cycle_times.size
+        steps = self.__cycle_times * resolution / problem.horizon
+        self.__weights = np.ceil(steps - 1e-9).astype(np.int64)
+        # rounded down, the knapsack admits every pattern that fits the horizon: pricing for the bound
+        self.__bound_weights = np.maximum(np.floor(steps + 1e-9), 1).astype(np.int64)
+        volumes = np.broadcast_to(cycle_table.train_volumes[np.newaxis, :, :], cycle_table.cycle_times.shape)
+        self.__feasible = (problem.trip_mask & (volumes > 0) & (cycle_table.cycle_times > 0)).reshape(-1)
+
+        u, l = cycle_table.cycle_times.shape[:2]
+        self.__departures = np.zeros((len(self.classes), self.__cells), dtype=bool)
+        for c, train_class in enumerate(self.classes):
+            if train_class.start is not None:
+                i = structure.empty_origin_positions[train_class.start.identifier]
+                self.__departures[c] = np.arange(self.__cells) // (l * u) == i
+
+        self.__rows = self.__build_rows()
+        self.__senses = np.concatenate([
+            self.__rows.senses,
+            np.array([
+                (RestrictionType.LESS_OR_EQUAL if c.start is None else RestrictionType.EQUALITY).value
+                for c in self.classes
+            ], dtype="<U1")
+        ])
+        self.__artificial = self.__build_artificial()
+        self.patterns = []      # (class, trips over (i, j, k)) of every generated pattern
+        self.__seed_counts = np.zeros(0)    # trains of the greedy plan running each initial pattern
+        self.iterations = 0
+        self.outcome = None
+
+    def __build_rows(self) -> ModelMatrix:
+        """
+        Master restrictions, but the class rows, over the trips of each class, a tensor with shape
+        (classes, U, L, U)
+        """
+        problem = self.problem
+        flows = list(problem.structure.flows)
+        structure = ProblemStructure(trains=len(self.classes), flows=flows)
+        trains = structure.trains
+        families = [
+            CapacityRestrictions(trains=trains, flows=flows, structure=structure),
+            ExchangeRestriction(trains=trains, bands=problem.exchange_bands, flows=flows, structure=structure),
+            MaximumDemandRestriction(trains=trains, demands=problem.demand, structure=structure),
+            EmptyOfferRestriction(trains=trains, flows=flows, structure=structure),
+            MinimumDemandRestriction(trains=trains, demands=problem.demand, structure=structure),
+        ]
+        costs = np.zeros(structure.cardinality)
+        for r in families[2].restrictions():
+            np.add.at(costs.reshape(-1), r.indices, r.values)
+        restrictions = [r for family in families for r in family.restrictions()]
+        return ModelMatrix.from_restrictions(restrictions=restrictions, costs=costs)
+
+    def __build_artificial(self) -> sparse.csc_matrix:
+        """
+        One column for each ">" and "=" row, penalized above the profit of any trip
+        """
+        rows = np.flatnonzero(self.__senses != RestrictionType.LESS_OR_EQUAL.value)
+        return sparse.csc_matrix(
+            (np.ones(len(rows)), (rows, np.arange(len(rows)))),
+            shape=(len(self.__senses), len(rows))
+        )
+
+    @property
+    def penalty(self) -> float:
+        return 10 * float(np.abs(self.__rows.costs).max(initial=0)) + 1
+
+    def master(self) -> ModelMatrix:
+        """
+        Master problem over the artificial columns followed by the generated patterns
+        :return:
+        """
+        classes = np.array([c for c, _ in self.patterns], dtype=np.int64)
+        trips = sparse.csc_matrix(
+            np.stack([t for _, t in self.patterns], axis=1) if self.patterns else np.zeros((self.__cells, 0))
+        )
+        # pattern p of class c runs its trips on the slice c of the class tensor
+        columns = np.repeat(np.arange(trips.shape[1]), np.diff(trips.indptr))
+        placement = sparse.csc_matrix(
+            (trips.data, (classes[columns] * self.__cells + trips.indices, columns)),
+            shape=(self.__rows.variables, len(self.patterns))
+        )
+        convexity = sparse.csr_matrix(
+            (np.ones(len(classes)), (classes, np.arange(len(classes)))),
+            shape=(len(self.classes), len(classes))
+        )
+        artificial = self.__artificial.shape[1]
+        coefficients = sparse.hstack([
+            self.__artificial,
+            sparse.vstack([self.__rows.coefficients @ placement, convexity])
+        ], format="csr")
+        costs = np.concatenate([np.full(artificial, -self.penalty), placement.T @ self.__rows.costs])
+        return ModelMatrix(
+            coefficients=coefficients,
+            senses=self.__senses,
+            resources=np.concatenate([self.__rows.resources, [c.size for c in self.classes]]).astype(float),
+            costs=costs,
+            shape=costs.shape
+        )
+
+    def price(self, duals: np.ndarray) -> list[tuple[int, np.ndarray, float]]:
+        """
+        Best pattern of each class for the master duals
+        :return: (class, trips, reduced profit) of the patterns with positive reduced profit
+        """
+        return self.__price(duals=duals, weights=self.__weights, threshold=self.tolerance)
+
+    def bound(self, relaxed: SolverOutcome) -> float:
+        """
+        Lagrangian bound of the master relaxation: every train of a class gains at most the best reduced
+        profit of the class. The pricing runs on cycle times rounded down, so it never misses a pattern.
+        :param relaxed: optimal master relaxation, with its duals
+        :return:
+        """
+        best = self.__price(duals=relaxed.duals, weights=self.__bound_weights, threshold=0)
+        return relaxed.objective + sum(self.classes[c].size * profit for c, _, profit in best)
+
+    def __price(
+            self,
+            duals: np.ndarray,
+            weights: np.ndarray,
+            threshold: float
+    ) -> list[tuple[int, np.ndarray, float]]:
+        row_duals, class_duals = duals[:self.__rows.constraints], duals[self.__rows.constraints:]
+        profits = self.__rows.costs - self.__rows.coefficients.T @ row_duals
+        profits = profits.reshape(len(self.classes), self.__cells)
+
+        patterns = []
+        for c in range(len(self.classes)):
+            departures = self.__departures[c]
+            columns = np.flatnonzero(self.__feasible & ((profits[c] > threshold) | departures))
+            if len(columns) == 0:
+                continue
+            profit, counts = self.__knapsack(
+                profits=profits[c, columns],
+                weights=weights[columns],
+                departures=departures[columns],
+                dispatch=departures.any()
+            )
+            reduced_profit = profit - class_duals[c]
+            if reduced_profit > threshold:
+                trips = np.zeros(self.__cells)
+                trips[columns] = counts
+                patterns.append((c, trips, reduced_profit))
+        return patterns
+
+    def __knapsack(
+            self,
+            profits: np.ndarray,
+            weights: np.ndarray,
+            departures: np.ndarray,
+            dispatch: bool
+    ) -> tuple[float, np.ndarray]:
+        """
+        Unbounded integer knapsack over the horizon steps, by dynamic programming. State 1 is reached once
+        the pattern departs from the class position, and the pattern must end there when `dispatch`.
+        :return: best profit and the trip count of each item
+        """
+        steps = self.resolution
+        best = np.full((2, steps + 1), -np.inf)
+        best[0, 0] = 0.0
+        item = np.full((2, steps + 1), -1)      # -1: idle step, the state is kept
+        source = np.zeros((2, steps + 1), dtype=np.int64)
+        for t in range(1, steps + 1):
+            before = t - weights
+            fits = before >= 0
+            before = np.where(fits, before, 0)
+            for state in (0, 1):
+                # items kept in the same state; departures lead to state 1 from either state
+                gains = np.where(fits & (departures <= state), best[state, before] + profits, -np.inf)
+                from_state = np.full(len(weights), state, dtype=np.int64)
+                if state == 1:
+                    departing = np.where(fits & departures, best[0, before] + profits, -np.inf)
+                    from_state = np.where(departing > gains, 0, 1)
+                    gains = np.maximum(gains, departing)
+                chosen = int(np.argmax(gains))
+                if gains[chosen] > best[state, t - 1]:
+                    best[state, t] = gains[chosen]
+                    item[state, t] = chosen
+                    source[state, t] = from_state[chosen]
+                else:
+                    best[state, t] = best[state, t - 1]
+
+        states = [1] if dispatch else [0, 1]
+        state = max(states, key=lambda s: best[s, steps])
+        profit = best[state, steps]
+        counts = np.zeros(len(weights))
+        if not np.isfinite(profit):
+            return -np.inf, counts
+        t = steps
+        while t > 0:
+            chosen = item[state, t]
+            if chosen < 0:
+                t -= 1
+                continue
+            counts[chosen] += 1
+            state, t = source[state, t], t - weights[chosen]
+        return float(profit), counts
+
+    def solve(self, max_time: float, progress: ProgressCallback = None) -> "RailroadResult":
+        """
+        Generates patterns until none has positive reduced profit, or `max_iterations` or the pricing share of
+        `max_time` is reached, and solves the integer master over them, starting from the greedy patterns
+        :param max_time: time limit in seconds for the whole decomposition
+        :param progress: called after each pricing round, with the iteration as node count, and during the
+            integer master; returning True stops the pricing, the integer master is still solved over the
+            patterns generated so far and the outcome is INTERRUPTED
+        :return: RailroadResult, or None when neither the integer master nor the greedy patterns gave a plan
+            without artificial columns. The outcome is INFEASIBLE only when the optimal master over converged
+            patterns still needs them, NO_SOLUTION when the master stopped early with them
+        """
+        begin = time.perf_counter()
+        pricing_time = max_time * (1 - self.master_share)
+        self.__add_initial_patterns()
+        relaxed = None
+        stopped = False
+        converged = False
+        build_time = 0.0
+        for self.iterations in range(1, self.max_iterations + 1):
+            time_left = max(pricing_time - (time.perf_counter() - begin), 0)
+            handle = self.backend.build(self.master())
+            build_time += handle.build_time
+            relaxed = self.backend.relax(handle, max_time=time_left)
+            if not relaxed.has_solution or relaxed.duals is None:
+                break
+            new = self.price(duals=relaxed.duals)
+            converged = not new
+            if progress is not None:
+                stopped = bool(progress(SolverProgress(
+                    incumbent=None,
+                    bound=None,
+                    nodes=self.iterations,
+                    elapsed=time.perf_counter() - begin
+                )))
+            if not new or stopped or time.perf_counter() - begin >= pricing_time:
+                break
+            self.patterns.extend((c, trips) for c, trips, _ in new)
+
+        optimal = relaxed is not None and relaxed.status == SolverStatus.OPTIMAL and relaxed.duals is not None
+        bound = self.bound(relaxed) if optimal else None
+        master = self.master()
+        handle = self.backend.build(master)
+        build_time += handle.build_time
+        time_left = max(max_time - (time.perf_counter() - begin), 0)
+        start = self.__start(master)
+        integer = self.backend.run(handle, max_time=time_left, start=start, progress=None if stopped else progress)
+        artificial = self.__artificial.shape[1]
+        values, objective = integer.values, integer.objective
+        if not self.__is_plan(values) and self.__is_plan(start):
+            # the master stopped before improving on the greedy patterns
+            values, objective = start, float(master.costs @ start)
+        status = SolverStatus.INTERRUPTED if stopped else integer.status
+        if not self.__is_plan(values):
+            if integer.has_solution:
+                proven = integer.status == SolverStatus.OPTIMAL and converged
+                status = SolverStatus.INFEASIBLE if proven else SolverStatus.NO_SOLUTION
+            values = None
+        self.outcome = SolverOutcome(
+            status=status,
+            values=values[artificial:] if values is not None else None,
+            objective=objective if values is not None else None,
+            build_time=build_time,
+            solve_time=time.perf_counter() - begin - build_time,
+            bound=bound
+        )
+        if values is not None:
+            return self.problem.build_plan_result(plan=SparsePlan.from_dense(self.plan(self.outcome.values)))
+
+    def __is_plan(self, values: np.ndarray) -> bool:
+        """
+        Whether master values are a plan of the problem: no artificial column is used
+        """
+        return values is not None and bool(np.all(values[:self.__artificial.shape[1]] <= self.tolerance))
+
+    def __start(self, master: ModelMatrix) -> np.ndarray:
+        """
+        Master values of the greedy plan: its patterns, and the artificial columns covering the rows it leaves
+        short
+        """
+        artificial = self.__artificial.shape[1]
+        counts = np.zeros(master.variables - artificial)
+        counts[:len(self.__seed_counts)] = self.__seed_counts
+        activity = master.coefficients[:, artificial:] @ counts
+        shortage = np.maximum(master.resources - activity, 0)
+        return np.concatenate([self.__artificial.T @ shortage, counts])
+
+    def plan(self, counts: np.ndarray) -> np.ndarray:
+        """
+        Assigns the chosen patterns to the trains of their class
+        :param counts: trains running each generated pattern
+        :return: trips by train, shape (trains, U, L, U)
+        """
+        shape = self.problem.cycle_table.cycle_times.shape
+        plan = np.zeros((self.problem.trains,) + shape)
+        free = [list(c.trains) for c in self.classes]
+        for (c, trips), count in zip(self.patterns, np.round(counts).astype(int)):
+            for _ in range(count):
+                plan[free[c].pop(0)] = trips.reshape(shape)
+        return plan
+
+    def __add_initial_patterns(self):
+        if self.patterns:
+            return
+        plan = GreedyPlanner(problem=self.problem).plan()
+        counts = []
+        for c, train_class in enumerate(self.classes):
+            for n in train_class.trains:
+                trips = plan[n].reshape(-1)
+                if trips.any() and (train_class.start is None or trips[self.__departures[c]].any()):
+                    self.patterns.append((c, trips))
+                    counts.append(1)
+            if train_class.start is None:
+                # idle trains, so the master always has a column even without any other pattern
+                self.patterns.append((c, np.zeros(self.__cells)))
+                counts.append(0)
+        self.__seed_counts = np.array(counts, dtype=float)
@@ -0,0 +1,113 @@
+"""
+This file implements GreedyPlanner: a constructive heuristic for the Railroad Optimization Problem - ROP.
+
+Every train starts at its initial position and repeatedly takes the trip from its current position with
+the best train volume per cycle time, flows with an unmet minimum demand first, while the trip still fits
+its remaining time and the origin capacity, exchange band and maximum demand left. The train then waits
+at the trip destination for its next trip, so the plan also respects the empty offer and initial dispatch
+restrictions. Trains without initial position take over, with a full time horizon, the position where a
+train stops.
+
+The plan is used standalone as a quick approximate answer or as a MIP start (see
+RailroadOptimizationProblem.optimize).
+"""
+from typing import TYPE_CHECKING
+import numpy as np
+from optimizer.train_classes import build_train_classes
+from optimizer.sparse_plan import SparsePlan
+
+if TYPE_CHECKING:
+    from optimizer.optimization_model import RailroadOptimizationProblem, RailroadResult
+
+
+class GreedyPlanner:
+    def __init__(self, problem: "RailroadOptimizationProblem"):
+        self.problem = problem
+        structure = problem.structure
+        cycle_table = problem.cycle_table
+        self.__cycle_times = cycle_table.cycle_times
+        self.__volumes = cycle_table.train_volumes
+        self.__feasible = problem.trip_mask & (self.__volumes > 0)[np.newaxis, :, :] & (self.__cycle_times > 0)
+
+        l, u = self.__volumes.shape
+        self.__capacity = np.array([n.capacity for n in structure.loaded_origins], dtype=float)
+        self.__bands = np.full(u, np.inf)
+        for band in reversed(problem.exchange_bands):     # the first band of a node wins
+            k = structure.loaded_destination_positions.get(band.node.identifier)
+            if k is not None:
+                self.__bands[k] = band.band
+        self.__maximum = np.zeros((l, u))
+        self.__minimum = np.zeros((l, u))
+        for demand in reversed(problem.demand):           # the first demand of a flow wins
+            j = structure.loaded_origin_positions[demand.flow.origin.identifier]
+            k = structure.loaded_destination_positions[demand.flow.destination.identifier]
+            self.__maximum[j, k] = demand.maximum
+            self.__minimum[j, k] = demand.minimum or 0
+
+    def plan(self) -> np.ndarray:
+        """
+        Builds the greedy plan
+        :return: trips by train, shape (trains, U, L, U)
+        """
+        problem = self.problem
+        u = len(problem.structure.empty_origins)
+        classes = build_train_classes(trains=problem.trains, empty_origins=list(problem.structure.empty_origins))
+        positions = np.full(problem.trains, -1)
+        for train_class in classes:
+            if train_class.start is not None:
+                positions[train_class.trains] = problem.structure.empty_origin_positions[train_class.start.identifier]
+        time_left = np.where(positions >= 0, float(problem.horizon), -np.inf)
+
+        capacity = self.__capacity.copy()
+        bands = self.__bands.copy()
+        maximum = self.__maximum.copy()
+        minimum = self.__minimum.copy()
+        ratio = np.divide(
+            self.__volumes[np.newaxis, :, :],
+            self.__cycle_times,
+            out=np.zeros(self.__cycle_times.shape),
+            where=self.__cycle_times > 0
+        )
+        plan = np.zeros((problem.trains, u) + self.__volumes.shape)
+        idle = list(np.flatnonzero(positions < 0)[::-1])
+        while np.isfinite(time_left).any():
+            n = int(np.argmax(time_left))
+            i = positions[n]
+            fits = (
+                self.__feasible[i] &
+                (self.__cycle_times[i] <= time_left[n]) &
+                (self.__volumes <= capacity[:, np.newaxis]) &
+                (self.__volumes <= maximum) &
+                (bands >= 1)[np.newaxis, :]
+            )
+            if not fits.any():
+                time_left[n] = -np.inf
+                if idle:
+                    m = idle.pop()
+                    positions[m] = i
+                    time_left[m] = float(problem.horizon)
+                continue
+            score = np.where(fits, ratio[i] + np.where(minimum > 0, ratio.max() + 1, 0), -np.inf)
+            j, k = np.unravel_index(np.argmax(score), score.shape)
+            volume = self.__volumes[j, k]
+            plan[n, i, j, k] += 1
+            time_left[n] -= self.__cycle_times[i, j, k]
+            capacity[j] -= volume
+            maximum[j, k] -= volume
+            minimum[j, k] -= volume
+            bands[k] -= 1
+            positions[n] = k
+        return plan
+
+    def start_values(self, plan: np.ndarray = None) -> np.ndarray:
+        """
+        The plan as one value per model column, aggregated by train class when the problem is
+        :return:
+        """
+        plan = self.plan() if plan is None else plan
+        if self.problem.train_classes is not None:
+            plan = np.stack([plan[c.trains].sum(axis=0) for c in self.problem.train_classes])
+        return plan.reshape(-1)[self.problem.variable_index.positions]
+
+    def result(self) -> "RailroadResult":
+        return self.problem.build_plan_result(plan=SparsePlan.from_dense(self.plan()))
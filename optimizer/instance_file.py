@@ -0,0 +1,127 @@
+"""
+This file saves and loads instances of the Railroad Optimization Problem - ROP - in a columnar format: one
+array per column of the nodes, flows, demands, transit times and exchange bands tables.
+
+    nodes           name, capacity, initial_trains
+    flows           origin, destination (rows of nodes), train_volume
+    demands         flow (row of flows), minimum (NaN for None), maximum
+    transit_times   origin, destination (rows of nodes), time
+    exchange_bands  node (row of nodes), band
+
+A path ending in .npz is a single compressed file, handy to share. Any other path is a directory with one
+.npy file per column, named <table>.<column>.npy, faster to read as it is not compressed. Columns are read
+whole, as every row becomes a Python object anyway. Nodes are stored in identifier order, so a loaded
+instance has the same fingerprint (see optimizer.model_cache) as the saved one.
+
+    problem = RailroadOptimizationProblem(**load_instance(path))
+"""
+from pathlib import Path
+import numpy as np
+from optimizer.restrictions.railroad_elements import Node, Flow, Demand, TransitTime, ExchangeBand, collect_nodes
+
+FORMAT_VERSION = 1
+
+
+def save_instance(
+        path,
+        trains: int,
+        demands: list[Demand],
+        transit_times: list[TransitTime],
+        exchange_bands: list[ExchangeBand],
+        time_horizon: int
+):
+    nodes = collect_nodes(demands=demands, transit_times=transit_times, exchange_bands=exchange_bands)
+    node_rows = {node.identifier: row for row, node in enumerate(nodes)}
+    flows = list({id(d.flow): d.flow for d in demands}.values())
+    flow_rows = {id(flow): row for row, flow in enumerate(flows)}
+
+    columns = {
+        "meta.version": np.array(FORMAT_VERSION),
+        "meta.trains": np.array(trains),
+        "meta.time_horizon": np.array(time_horizon),
+        "nodes.name": np.array([node.name for node in nodes], dtype=str),
+        "nodes.capacity": np.array([node.capacity for node in nodes], dtype=float),
+        "nodes.initial_trains": np.array([node.initial_trains for node in nodes], dtype=np.int64),
+        "flows.origin": np.array([node_rows[f.origin.identifier] for f in flows], dtype=np.int64),
+        "flows.destination": np.array([node_rows[f.destination.identifier] for f in flows], dtype=np.int64),
+        "flows.train_volume": np.array([f.train_volume for f in flows], dtype=float),
+        "demands.flow": np.array([flow_rows[id(d.flow)] for d in demands], dtype=np.int64),
+        "demands.minimum": np.array([np.nan if d.minimum is None else d.minimum for d in demands], dtype=float),
+        "demands.maximum": np.array([d.maximum for d in demands], dtype=float),
+        "transit_times.origin": np.array([node_rows[t.origin.identifier] for t in transit_times], dtype=np.int64),
+        "transit_times.destination": np.array(
+            [node_rows[t.destination.identifier] for t in transit_times], dtype=np.int64
+        ),
+        "transit_times.time": np.array([t.time for t in transit_times], dtype=float),
+        "exchange_bands.node": np.array([node_rows[b.node.identifier] for b in exchange_bands], dtype=np.int64),
+        "exchange_bands.band": np.array([b.band for b in exchange_bands], dtype=np.int64),
+    }
+    path = Path(path)
+    if path.suffix == ".npz":
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, **columns)
+        return
+    path.mkdir(parents=True, exist_ok=True)
+    for name, values in columns.items():
+        np.save(path / f"{name}.npy", values)
+
+
+def load_instance(path) -> dict:
+    """
+    :return: trains, demands, transit_times, exchange_bands and time_horizon, the RailroadOptimizationProblem
+        arguments
+    """
+    path = Path(path)
+    if path.suffix == ".npz":
+        with np.load(path) as data:
+            columns = {name: data[name] for name in data.files}
+    else:
+        columns = {file.name[:-len(".npy")]: np.load(file) for file in path.glob("*.npy")}
+    version = int(columns["meta.version"])
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Instance format {version} is not supported, expected {FORMAT_VERSION}")
+
+    nodes = [
+        Node(name=name, capacity=capacity, initial_trains=initial_trains)
+        for name, capacity, initial_trains in zip(
+            columns["nodes.name"].tolist(),
+            columns["nodes.capacity"].tolist(),
+            columns["nodes.initial_trains"].tolist()
+        )
+    ]
+    flows = [
+        Flow(origin=nodes[origin], destination=nodes[destination], train_volume=train_volume)
+        for origin, destination, train_volume in zip(
+            columns["flows.origin"].tolist(),
+            columns["flows.destination"].tolist(),
+            columns["flows.train_volume"].tolist()
+        )
+    ]
+    minimums = columns["demands.minimum"]
+    demands = [
+        Demand(flow=flows[flow], minimum=minimum, maximum=maximum)
+        for flow, minimum, maximum in zip(
+            columns["demands.flow"].tolist(),
+            np.where(np.isnan(minimums), None, minimums).tolist(),
+            columns["demands.maximum"].tolist()
+        )
+    ]
+    transit_times = [
+        TransitTime(origin=nodes[origin], destination=nodes[destination], time=time)
+        for origin, destination, time in zip(
+            columns["transit_times.origin"].tolist(),
+            columns["transit_times.destination"].tolist(),
+            columns["transit_times.time"].tolist()
+        )
+    ]
+    exchange_bands = [
+        ExchangeBand(node=nodes[node], band=band)
+        for node, band in zip(columns["exchange_bands.node"].tolist(), columns["exchange_bands.band"].tolist())
+    ]
+    return dict(
+        trains=int(columns["meta.trains"]),
+        demands=demands,
+        transit_times=transit_times,
+        exchange_bands=exchange_bands,
+        time_horizon=columns["meta.time_horizon"].item()
+    )
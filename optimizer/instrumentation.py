@@ -0,0 +1,151 @@
+"""
+This file declares the instrumentation surface of the Railroad Optimization Problem - ROP.
+
+An Observer is given to RailroadOptimizationProblem (and passed on to its RailroadResult) and receives:
+
+    PhaseEvent      wall time, CPU time and peak memory of a phase: each restriction family build
+                    ("restrictions.<family>"), the model assembly ("model.assembly"), the backend build and
+                    run ("solve.build", "solve.run"), the result build ("result.build") and each report
+                    ("report.<name>")
+    messages        the informational text the problem used to print (cardinality, model size, bound)
+
+Observer ignores everything, PrintObserver - the default - prints messages and one line per phase, and
+Profiler keeps the events for inspection. Peak memory is traced with tracemalloc, only when the observer
+asks for it (`trace_memory`), as tracing slows every allocation down.
+
+tracemalloc is global to the process, so memory is traced for a single solve at a time: the first thread
+to open a phase with `trace_memory` owns tracing until its outermost phase ends, and the phases of other
+threads - e.g. concurrent solves of optimizer.async_api - report a peak memory of 0.
+"""
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Iterator, Optional
+
+
+@dataclass(frozen=True)
+class PhaseEvent:
+    phase: str
+    wall_time: float
+    cpu_time: float
+    peak_memory: int = 0
+    """bytes allocated at the peak of the phase above its start, 0 when memory is not traced"""
+    details: dict = field(default_factory=dict)
+
+
+class _MemoryTracing:
+    """
+    Ownership of tracemalloc by the phases of one thread, and their [baseline, highest absolute peak]
+    """
+    lock = threading.Lock()
+    owner: Optional[int] = None
+    started = False         # tracemalloc was started by the owner, and is stopped with its outermost phase
+    stack: list = []
+
+    @classmethod
+    def acquire(cls) -> bool:
+        """
+        :return: True when the calling thread owns tracing, acquiring it if nobody does
+        """
+        with cls.lock:
+            if cls.owner is None:
+                cls.owner = threading.get_ident()
+                cls.started = not tracemalloc.is_tracing()
+                if cls.started:
+                    tracemalloc.start()
+            return cls.owner == threading.get_ident()
+
+    @classmethod
+    def release(cls):
+        with cls.lock:
+            if not cls.stack:
+                if cls.started:
+                    tracemalloc.stop()
+                cls.owner, cls.started = None, False
+
+
+class Observer:
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+
+    def on_event(self, event: PhaseEvent):
+        pass
+
+    def on_message(self, message: str):
+        pass
+
+    @contextmanager
+    def phase(self, name: str, **details) -> Iterator[dict]:
+        """
+        Times the body of the `with` block and notifies its PhaseEvent. The yielded dict collects details
+        known only inside the block, e.g. the rows built.
+        """
+        stack = _MemoryTracing.stack
+        traced = self.trace_memory and _MemoryTracing.acquire()
+        if traced:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            stack.append([current, current])
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield details
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak_memory = 0
+            if traced:
+                baseline, highest = stack.pop()
+                highest = max(highest, tracemalloc.get_traced_memory()[1])
+                peak_memory = highest - baseline
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], highest)
+                _MemoryTracing.release()
+            self.on_event(PhaseEvent(
+                phase=name,
+                wall_time=wall,
+                cpu_time=cpu,
+                peak_memory=peak_memory,
+                details=details
+            ))
+
+
+class PrintObserver(Observer):
+    def on_event(self, event: PhaseEvent):
+        memory = f", peak {event.peak_memory / 2 ** 20:.1f} MiB" if self.trace_memory else ""
+        details = "".join(f", {key}={value}" for key, value in event.details.items())
+        print(f"{event.phase}: {event.wall_time:.3f}s (cpu {event.cpu_time:.3f}s{memory}{details})")
+
+    def on_message(self, message: str):
+        print(message)
+
+
+class Profiler(Observer):
+    def __init__(self, trace_memory: bool = True):
+        super().__init__(trace_memory=trace_memory)
+        self.events: list[PhaseEvent] = []
+        self.messages: list[str] = []
+
+    def on_event(self, event: PhaseEvent):
+        self.events.append(event)
+
+    def on_message(self, message: str):
+        self.messages.append(message)
+
+    def total(self, prefix: str) -> PhaseEvent:
+        """
+        Sum of the times and highest peak of the events whose phase starts with `prefix`
+        :return:
+        """
+        events = [e for e in self.events if e.phase.startswith(prefix)]
+        return PhaseEvent(
+            phase=prefix,
+            wall_time=sum(e.wall_time for e in events),
+            cpu_time=sum(e.cpu_time for e in events),
+            peak_memory=max((e.peak_memory for e in events), default=0)
+        )
+
+    def records(self) -> list[dict]:
+        return [asdict(event) for event in self.events]
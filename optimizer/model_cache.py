@@ -0,0 +1,135 @@
+"""
+This file implements ModelCache: an on-disk cache of assembled ModelMatrix objects of the Railroad
+Optimization Problem - ROP - keyed by an instance fingerprint.
+
+The fingerprint hashes everything the model matrix depends on: node capacities and initial trains, flows
+and demands, transit times, exchange bands, trains, time horizon and the formulation options. Nodes enter
+by their rank in identifier order, never by identifier or name, so the same instance built twice - in the
+same process or not - has the same fingerprint. Each model is stored as a compressed .npz file.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from scipy import sparse
+from optimizer.model_matrix import ModelMatrix
+from optimizer.restrictions.railroad_elements import Demand, TransitTime, ExchangeBand, collect_nodes
+from optimizer.variable_index import VariableIndex
+
+FORMAT_VERSION = 1
+
+
+def instance_fingerprint(
+        trains: int,
+        demands: list[Demand],
+        transit_times: list[TransitTime],
+        exchange_bands: list[ExchangeBand],
+        time_horizon: int,
+        **options
+) -> str:
+    """
+    :param options: formulation options that change the model, e.g. aggregate_trains, prune_variables and
+        structural_pruning
+    :return: hexadecimal sha256 digest
+    """
+    nodes = collect_nodes(demands=demands, transit_times=transit_times, exchange_bands=exchange_bands)
+    ranks = {node.identifier: rank for rank, node in enumerate(nodes)}
+
+    def optional(value) -> float:
+        return np.nan if value is None else float(value)
+
+    tables = {
+        "scalars": [FORMAT_VERSION, trains, time_horizon],
+        "options": [float(options[name]) for name in sorted(options)],
+        "nodes": [(node.capacity, node.initial_trains) for node in nodes],
+        "demands": [
+            (
+                ranks[d.flow.origin.identifier],
+                ranks[d.flow.destination.identifier],
+                d.flow.train_volume,
+                optional(d.minimum),
+                optional(d.maximum)
+            )
+            for d in demands
+        ],
+        "transit_times": [
+            (ranks[t.origin.identifier], ranks[t.destination.identifier], t.time) for t in transit_times
+        ],
+        "exchange_bands": [(ranks[b.node.identifier], b.band) for b in exchange_bands],
+    }
+    digest = hashlib.sha256()
+    for name, rows in tables.items():
+        table = np.array(rows, dtype=np.float64)
+        digest.update(name.encode())
+        digest.update(np.array(table.shape, dtype=np.int64).tobytes())
+        digest.update(np.ascontiguousarray(table).tobytes())
+    digest.update(",".join(sorted(options)).encode())
+    return digest.hexdigest()
+
+
+class ModelCache:
+    def __init__(self, directory):
+        """
+        :param directory: folder of the cached models, created on first store
+        """
+        self.directory = Path(directory)
+
+    def path(self, fingerprint: str) -> Path:
+        return self.directory / f"{fingerprint}.npz"
+
+    def load(self, fingerprint: str) -> Optional[ModelMatrix]:
+        """
+        :return: the cached model, or None on a miss or an unreadable file
+        """
+        path = self.path(fingerprint)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != FORMAT_VERSION:
+                    return None
+                shape = tuple(int(s) for s in data["shape"])
+                coefficients = sparse.csr_matrix(
+                    (data["data"], data["indices"], data["indptr"]),
+                    shape=tuple(int(s) for s in data["matrix_shape"])
+                )
+                return ModelMatrix(
+                    coefficients=coefficients,
+                    senses=data["senses"],
+                    resources=data["resources"],
+                    costs=data["costs"],
+                    shape=shape,
+                    index=VariableIndex(shape=shape, positions=data["positions"])
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def store(self, fingerprint: str, model: ModelMatrix):
+        """
+        Writes the model atomically, so concurrent runs never read a partial file
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        coefficients = model.coefficients.tocsr()
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".npz.tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez_compressed(
+                    file,
+                    version=FORMAT_VERSION,
+                    data=coefficients.data,
+                    indices=coefficients.indices,
+                    indptr=coefficients.indptr,
+                    matrix_shape=np.array(coefficients.shape),
+                    senses=model.senses,
+                    resources=model.resources,
+                    costs=model.costs,
+                    shape=np.array(model.shape),
+                    positions=model.index.positions
+                )
+            os.replace(temporary, self.path(fingerprint))
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
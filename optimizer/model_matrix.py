@@ -0,0 +1,77 @@
+"""
+This file assembles the restrictions of the Railroad Optimization Problem - ROP - in matrix form:
+
+    maximize costs * x  subject to  coefficients * x (senses) resources,  x >= 0 and integer
+
+Only the variables listed in `index` are part of the model, every other variable is fixed at zero.
+"""
+import numpy as np
+from scipy import sparse
+from dataclasses import dataclass
+from optimizer.restrictions.restrictions import Restriction, stack_restrictions
+from optimizer.variable_index import VariableIndex
+
+
+@dataclass
+class ModelMatrix:
+    coefficients: sparse.csr_matrix
+    senses: np.ndarray
+    resources: np.ndarray
+    costs: np.ndarray
+    shape: tuple
+    index: VariableIndex = None
+
+    def __post_init__(self):
+        if self.index is None:
+            self.index = VariableIndex(shape=self.shape)
+
+    @classmethod
+    def from_restrictions(
+            cls,
+            restrictions: list[Restriction],
+            costs: np.ndarray,
+            index: VariableIndex = None
+    ) -> "ModelMatrix":
+        """
+        Stacks the sparse entries of every restriction as the rows of a single CSR matrix
+        :param restrictions: constraints, one row each
+        :param costs: objective coefficients as a tensor with the variables shape
+        :param index: variables kept in the model (all when None)
+        :return:
+        """
+        shape = costs.shape
+        if index is None:
+            index = VariableIndex(shape=shape)
+
+        coefficients = stack_restrictions(
+            restrictions=restrictions,
+            columns=len(index),
+            mapping=index.from_positions
+        )
+        return cls(
+            coefficients=coefficients,
+            senses=np.array([r.sense for r in restrictions], dtype="<U1"),
+            resources=np.array([r.resource for r in restrictions], dtype=float),
+            costs=costs.reshape(-1)[index.positions],
+            shape=shape,
+            index=index
+        )
+
+    def expand(self, values: np.ndarray) -> np.ndarray:
+        """
+        Places the value of each model column in the full variable tensor
+        :return:
+        """
+        return self.index.expand(values)
+
+    @property
+    def variables(self) -> int:
+        return self.coefficients.shape[1]
+
+    @property
+    def constraints(self) -> int:
+        return self.coefficients.shape[0]
+
+    @property
+    def nonzeros(self) -> int:
+        return self.coefficients.nnz
@@ -3,16 +3,33 @@ This file builds the Railroad Optimization Problem in the format to be used in G
 
 """
 import numpy as np
-import gurobipy as gp
-from optimizer.restrictions.railroad_elements import Flow, TransitTime, Demand, ExchangeBand, Node
-from optimizer.restrictions.restrictions import Restrictions, RestrictionType, Restriction
+from optimizer.restrictions.railroad_elements import Flow, TransitTime, Demand, ExchangeBand, Node, \
+    ProblemStructure
+from optimizer.restrictions.restrictions import Restrictions, Restriction
 from optimizer.restrictions.capacity_restriction import CapacityRestrictions
 from optimizer.restrictions.exchange_restriction import ExchangeRestriction
-from optimizer.restrictions.time_horizon_restriction import TimeHorizonRestriction
+from optimizer.restrictions.time_horizon_restriction import TimeHorizonRestriction, CycleTimeTable
 from optimizer.restrictions.empty_offer_restriction import EmptyOfferRestriction
 from optimizer.restrictions.dispatch_initial_train_restriction import DispatchInitialTrain
 from optimizer.restrictions.demand_restriction import MaximumDemandRestriction, MinimumDemandRestriction
+from optimizer.model_matrix import ModelMatrix
+from optimizer.variable_index import VariableIndex
+from optimizer.sparse_plan import SparsePlan
+from optimizer.solvers.solver_backend import SolverBackend, SolverOutcome, SolverStatus, SolverProgress, \
+    ProgressCallback
+from optimizer.solvers.gurobi_backend import GurobiBackend
+from optimizer.train_classes import build_train_classes, disaggregate
+from optimizer.heuristics import GreedyPlanner
+from optimizer.rounding import RelaxAndRound
+from optimizer.column_generation import ColumnGeneration
+from optimizer.model_cache import ModelCache, instance_fingerprint
+from optimizer.instrumentation import Observer, PrintObserver
+from contextlib import nullcontext
 from dataclasses import dataclass
+from functools import cached_property
+from enum import Enum
+import threading
+import time
 import pandas as pd
 
 pd.set_option("display.max_columns", 10)
@@ -20,61 +37,117 @@ pd.set_option("display.max_columns", 10)
 
 @dataclass
 class RailroadResult:
-    optimization_result: np.ndarray
+    """
+    Plan of a solved problem and its reports. The plan is kept sparse (see SparsePlan); the aggregates behind
+    the reports are reductions of its nonzero entries, computed on first use and cached, and the dense
+    tensor `optimization_result` is only built when asked for.
+    `needs_repair` is True when the plan of an aggregated formulation could not be split among the trains
+    within the time horizon (see optimizer.train_classes): it is then only feasible for the train classes.
+    """
+    plan: SparsePlan
     load_terminals: list[Node]
     unload_terminals: list[Node]
     demand: list[Demand]
     transit_times: np.ndarray
+    cycle_times: np.ndarray = None
+    observer: Observer = None
+    needs_repair: bool = False
+
+    def __phase(self, name: str):
+        return nullcontext() if self.observer is None else self.observer.phase(name)
+
+    @cached_property
+    def optimization_result(self) -> np.ndarray:
+        """
+        Trips by train, shape (trains, U, L, U)
+        """
+        return self.plan.to_dense()
+
+    @cached_property
+    def flow_travels(self) -> np.ndarray:
+        """
+        Loaded trips by flow, shape (L, U)
+        """
+        return self.plan.reduce(keep=(2, 3))
+
+    @cached_property
+    def empty_travels(self) -> np.ndarray:
+        """
+        Empty trips by unload point and load point, shape (U, L)
+        """
+        return self.plan.reduce(keep=(1, 2))
+
+    @cached_property
+    def time_by_train(self) -> np.ndarray:
+        """
+        Time used by each train. Trips are timed with the cycle time table of the time horizon restriction
+        when available, otherwise with the loaded transit time only.
+        """
+        trip_times = self.transit_times if self.cycle_times is None else self.cycle_times
+        return self.plan.reduce(keep=(0,), weights=trip_times)
+
+    @cached_property
+    def __demand_positions(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Position of the origin, in load_terminals, and of the destination, in unload_terminals, of each demand
+        """
+        load_positions = ProblemStructure.build_positions(nodes=self.load_terminals)
+        unload_positions = ProblemStructure.build_positions(nodes=self.unload_terminals)
+        origins = np.array([load_positions[d.flow.origin.identifier] for d in self.demand], dtype=np.int64)
+        destinations = np.array(
+            [unload_positions[d.flow.destination.identifier] for d in self.demand], dtype=np.int64
+        )
+        return origins, destinations
 
     def accpt_volume(self, verbose=True):
-        accept = []
-        train_volumes = np.zeros((len(self.load_terminals), len(self.unload_terminals)))
-        travels = np.sum(self.optimization_result, axis=(0, 1))
-        for demand in self.demand:
-            train_volume = demand.flow.train_volume
-            i = self.load_terminals.index(demand.flow.origin)
-            j = self.unload_terminals.index(demand.flow.destination)
-            train_volumes[i, j] = train_volume
-            flow_travels = travels[i, j]
-            flow_volume = flow_travels * train_volume
+        with self.__phase("report.accepted_volume"):
+            i, j = self.__demand_positions
+            travels = self.flow_travels[i, j]
+            volumes = travels * np.array([d.flow.train_volume for d in self.demand], dtype=float)
             if verbose:
-                print(f"{demand.flow.origin}->{demand.flow.destination}: {flow_volume} TU \t")
-            accept.append({
-                "origin": demand.flow.origin,
-                "destination": demand.flow.destination,
-                "demand max": demand.maximum,
-                "demand minimum": demand.minimum,
-                "accept volume": flow_volume,
-                "travels": flow_travels,
-                "flow": f"{i}|{j}"
+                for demand, flow_volume in zip(self.demand, volumes):
+                    print(f"{demand.flow.origin}->{demand.flow.destination}: {flow_volume} TU \t")
+            accept = pd.DataFrame({
+                "origin": [d.flow.origin for d in self.demand],
+                "destination": [d.flow.destination for d in self.demand],
+                "demand max": [d.maximum for d in self.demand],
+                "demand minimum": [d.minimum for d in self.demand],
+                "accept volume": volumes,
+                "travels": travels,
+                "flow": [f"{origin}|{destination}" for origin, destination in zip(i.tolist(), j.tolist())]
             })
-        accept = pd.DataFrame(accept)
-        return accept
+            return accept
 
     def empty_offer(self):
-        report = []
-        empty_travels = np.sum(self.optimization_result, axis=(0, 3))
-        for i, origin in enumerate(self.unload_terminals):
-            for j, destination in enumerate(self.load_terminals):
-                travels = empty_travels[i, j]
-                report.append({
-                    "origin": origin,
-                    "destination": destination,
-                    "travels": travels
-                })
-        report = pd.DataFrame(report)
-        return report
+        with self.__phase("report.empty_offer"):
+            u, l = self.empty_travels.shape
+            report = pd.DataFrame({
+                "origin": np.repeat(np.array(self.unload_terminals, dtype=object), l),
+                "destination": np.tile(np.array(self.load_terminals, dtype=object), u),
+                "travels": self.empty_travels.ravel()
+            })
+            return report
 
     def train_utilization(self, total_time):
-        travel_times = self.optimization_result * self.transit_times
-        time_by_train = np.sum(travel_times, axis=(1, 2, 3)) / total_time
-        return time_by_train
+        """
+        Share of `total_time` used by each train (see time_by_train)
+        :return:
+        """
+        with self.__phase("report.train_utilization"):
+            return self.time_by_train / total_time
 
     def travels_by_train(self):
-        travels = np.sum(self.optimization_result, axis=(1, 2, 3))
+        travels = self.plan.reduce(keep=(0,))
         return travels
 
 
+class OptimizationMode(Enum):
+    EXACT = "exact"
+    """Integer model solved by the backend"""
+    RELAX_AND_ROUND = "relax_and_round"
+    """Continuous relaxation solved by the backend, then rounded and repaired (see optimizer.rounding)"""
+    COLUMN_GENERATION = "column_generation"
+    """Decomposition over per-train trip patterns (see optimizer.column_generation)"""
 
 
 class RailroadOptimizationProblem:
@@ -85,100 +158,432 @@ class RailroadOptimizationProblem:
             transit_times: list[TransitTime],
             exchange_bands: list[ExchangeBand],
             time_horizon: int,
+            aggregate_trains: bool = False,
+            prune_variables: bool = True,
+            structural_pruning: bool = False,
+            model_cache: ModelCache = None,
+            observer: Observer = None,
     ):
-        # Building constraints
+        """
+        :param prune_variables: when True, the variables whose trip can not fit the time horizon are left out
+            of the model (see ProblemStructure.fitting_variables); they are zero in every solution. Re-solves
+            of a SolveSession keep the columns of the transit times and time horizon given here.
+        :param structural_pruning: when True, only the trips backed by a flow with a timed empty move are
+            part of the model (see ProblemStructure.feasible_variables). This forbids the zero-time moves of
+            the full formulation, so the optimum may change (see README)
+        :param aggregate_trains: when True, trains are grouped in classes by initial position and the
+            variables count the trips of each class (see optimizer.train_classes). Results are
+            disaggregated back to one tensor slice per train.
+        :param model_cache: when given, the model matrix is loaded from it if an identical instance was
+            built before, and assembled and stored in it otherwise. On a hit the restriction families are only
+            built when first read (see ensure_families). Without a cache, the model matrix is assembled when
+            first read (see model_matrix).
+        :param observer: receives the timing and memory of each phase and the informational messages
+            (see optimizer.instrumentation); PrintObserver by default
+        """
+        self.observer = observer if observer is not None else PrintObserver()
         self.demand = demands
+        self.transit_times = transit_times
+        self.exchange_bands = exchange_bands
+        self.horizon = time_horizon
         flows = [d.flow for d in demands]
         self.trains = trains
-        self.capacity = CapacityRestrictions(trains=trains, flows=flows)
-        print(f"Cardinality: {self.capacity.cardinality}")
-
-        self.exchange = ExchangeRestriction(trains=trains, bands=exchange_bands, flows=flows)
-        self.time_horizon = TimeHorizonRestriction(
-            trains=trains,
-            transit_times=transit_times,
+        self.train_classes = None
+        variable_trains = trains
+        if aggregate_trains:
+            empty_origins = ProblemStructure.build_unload_points(flows=flows)
+            self.train_classes = build_train_classes(trains=trains, empty_origins=empty_origins)
+            variable_trains = len(self.train_classes)
+        self.structure = ProblemStructure(trains=variable_trains, flows=flows)
+        self.prune_variables = prune_variables
+        self.structural_pruning = structural_pruning
+        self.observer.on_message(f"Cardinality: {self.structure.cardinality}")
+        self.__labels = None
+        self.__families = None
+        self.__families_lock = threading.Lock()
+        self.__cycle_table = None
+        self.__cycle_table_lock = threading.Lock()
+        self.__model_matrix = None
+        self.__model_lock = threading.Lock()
+        self.__model_cache = model_cache
+
+        self.fingerprint = None
+        cached = None
+        if model_cache is not None:
+            self.fingerprint = instance_fingerprint(
+                trains=trains,
+                demands=demands,
+                transit_times=transit_times,
+                exchange_bands=exchange_bands,
+                time_horizon=time_horizon,
+                aggregate_trains=aggregate_trains,
+                prune_variables=prune_variables,
+                structural_pruning=structural_pruning
+            )
+            with self.observer.phase("model.cache_load") as details:
+                cached = model_cache.load(self.fingerprint)
+                details["hit"] = cached is not None
+        if cached is not None:
+            self.variable_index = cached.index
+            self.__model_matrix = cached
+            return
+
+        mask = np.broadcast_to(self.trip_mask, self.structure.cardinality)
+        positions = None if mask.all() else np.flatnonzero(mask)
+        self.variable_index = VariableIndex(shape=self.structure.cardinality, positions=positions)
+        if model_cache is not None:
+            self.model_matrix       # stored for the next runs of the instance
+
+    @property
+    def model_matrix(self) -> ModelMatrix:
+        """
+        Model of the problem, assembled with its restriction families when first read (see build_restrictions)
+        and then stored in the model cache, if any. Column generation builds its own master problem and never
+        reads it. Safe to call from several threads.
+        """
+        if self.__model_matrix is None:
+            with self.__model_lock:
+                if self.__model_matrix is None:
+                    self.build_restrictions()
+                    if self.__model_cache is not None:
+                        with self.observer.phase("model.cache_store"):
+                            self.__model_cache.store(self.fingerprint, self.__model_matrix)
+        return self.__model_matrix
+
+    @cached_property
+    def trip_mask(self) -> np.ndarray:
+        """
+        Trips (i, j, k) that are model columns for every train, shape (U, L, U) (see prune_variables and
+        structural_pruning)
+        """
+        mask = np.ones(self.structure.cardinality[1:], dtype=bool)
+        if self.prune_variables:
+            mask &= self.structure.fitting_variables(transit_times=self.transit_times, time_horizon=self.horizon)[0]
+        if self.structural_pruning:
+            mask &= self.structure.feasible_variables(transit_times=self.transit_times)[0]
+        return mask
+
+    @property
+    def cycle_table(self) -> CycleTimeTable:
+        """
+        Time of each trip with the current node capacities. It only depends on the structure, transit times
+        and time horizon, so reading it does not build the restriction families; build_families renews it.
+        """
+        if self.__cycle_table is None:
+            with self.__cycle_table_lock:
+                if self.__cycle_table is None:
+                    self.__cycle_table = self.__build_cycle_table()
+        return self.__cycle_table
+
+    def __build_cycle_table(self) -> CycleTimeTable:
+        return CycleTimeTable(structure=self.structure, transit_times=self.transit_times, time_horizon=self.horizon)
+
+    def build_restrictions(self):
+        """
+        (Re)builds every restriction family and the model matrix from the current demands, node capacities,
+        exchange bands, transit times and time horizon. The problem structure and variable index are kept.
+        """
+        self.build_families()
+        with self.observer.phase("model.assembly") as details:
+            self.__model_matrix = ModelMatrix.from_restrictions(
+                restrictions=self.geq_constraints + self.leq_constraints,
+                costs=self.costs,
+                index=self.variable_index
+            )
+            details["nonzeros"] = self.__model_matrix.nonzeros
+
+    def ensure_families(self):
+        """
+        Builds the restriction families once if they are not built yet, i.e. when the model matrix came from
+        the cache. Safe to call from several threads.
+        """
+        if self.__families is not None:
+            return
+        with self.__families_lock:
+            if self.__families is None:
+                self.build_families()
+
+    def build_families(self):
+        """
+        (Re)builds every restriction family, the costs and the constraint lists, but not the model matrix
+        """
+        structure = self.structure
+        variable_trains = structure.trains
+        flows = list(structure.flows)
+        cycle_table = self.__build_cycle_table()
+        capacity = self.__family("capacity", lambda: CapacityRestrictions(
+            trains=variable_trains,
             flows=flows,
-            time_horizon=time_horizon
-        )
-        self.minimum_demand = MinimumDemandRestriction(trains=trains, demands=demands)
-        self.maximum_demand = MaximumDemandRestriction(trains=trains, demands=demands)
-        self.empty_offer = EmptyOfferRestriction(trains=trains, flows=flows)
-        self.dispatch_initial_trains = DispatchInitialTrain(trains=trains, flows=flows)
-
-        self.costs = sum([r.coefficients for r in self.maximum_demand.restrictions()])
-
-        self.geq_constraints = []
-        self.geq_constraints.extend(self.capacity.restrictions())
-        self.geq_constraints.extend(self.exchange.restrictions())
-        self.geq_constraints.extend(self.time_horizon.restrictions())
-        self.geq_constraints.extend(self.maximum_demand.restrictions())
-        self.geq_constraints.extend(self.empty_offer.restrictions())
-
-        self.leq_constraints = []
-        self.leq_constraints.extend(self.minimum_demand.restrictions())
-        self.leq_constraints.extend(self.dispatch_initial_trains.restrictions())
-
-    def optimize(self, max_time):
-        print(self)
-        labels = self.labels()
-        # Building GUROBI model
-        model = gp.Model("Railroad Optimization Problem")
-        model.Params.TimeLimit = max_time
-        # model.setParam('OutputFlag', 0)
-        x = model.addVars(
-            labels,
-            vtype=gp.GRB.INTEGER
+            structure=structure
+        ))
+        exchange = self.__family("exchange", lambda: ExchangeRestriction(
+            trains=variable_trains,
+            bands=self.exchange_bands,
+            flows=flows,
+            structure=structure
+        ))
+        time_horizon = self.__family("time_horizon", lambda: TimeHorizonRestriction(
+            trains=variable_trains,
+            transit_times=self.transit_times,
+            flows=flows,
+            time_horizon=self.horizon,
+            train_classes=self.train_classes,
+            structure=structure,
+            cycle_table=cycle_table
+        ))
+        minimum_demand = self.__family("minimum_demand", lambda: MinimumDemandRestriction(
+            trains=variable_trains,
+            demands=self.demand,
+            structure=structure
+        ))
+        maximum_demand = self.__family("maximum_demand", lambda: MaximumDemandRestriction(
+            trains=variable_trains,
+            demands=self.demand,
+            structure=structure
+        ))
+        empty_offer = self.__family("empty_offer", lambda: EmptyOfferRestriction(
+            trains=variable_trains,
+            flows=flows,
+            structure=structure
+        ))
+        dispatch_initial_trains = self.__family("dispatch_initial_trains", lambda: DispatchInitialTrain(
+            trains=variable_trains,
+            flows=flows,
+            train_classes=self.train_classes,
+            structure=structure
+        ))
+
+        costs = np.zeros(self.structure.cardinality)
+        for r in maximum_demand.restrictions():
+            np.add.at(costs.reshape(-1), r.indices, r.values)
+
+        geq_constraints = []
+        geq_constraints.extend(capacity.restrictions())
+        geq_constraints.extend(exchange.restrictions())
+        geq_constraints.extend(time_horizon.restrictions())
+        geq_constraints.extend(maximum_demand.restrictions())
+        geq_constraints.extend(empty_offer.restrictions())
+
+        leq_constraints = []
+        leq_constraints.extend(minimum_demand.restrictions())
+        leq_constraints.extend(dispatch_initial_trains.restrictions())
+
+        # published at once, so concurrent readers see either the previous families or the new ones
+        self.__cycle_table = cycle_table
+        self.__families = dict(
+            capacity=capacity,
+            exchange=exchange,
+            time_horizon=time_horizon,
+            minimum_demand=minimum_demand,
+            maximum_demand=maximum_demand,
+            empty_offer=empty_offer,
+            dispatch_initial_trains=dispatch_initial_trains,
+            costs=costs,
+            geq_constraints=geq_constraints,
+            leq_constraints=leq_constraints
         )
-        model.setObjective(
-            expr=gp.quicksum([x[i] * self.costs[i] for i in x]),
-            sense=gp.GRB.MAXIMIZE
+
+    def __built(self, name: str):
+        self.ensure_families()
+        return self.__families[name]
+
+    @property
+    def capacity(self) -> CapacityRestrictions:
+        return self.__built("capacity")
+
+    @property
+    def exchange(self) -> ExchangeRestriction:
+        return self.__built("exchange")
+
+    @property
+    def time_horizon(self) -> TimeHorizonRestriction:
+        return self.__built("time_horizon")
+
+    @property
+    def minimum_demand(self) -> MinimumDemandRestriction:
+        return self.__built("minimum_demand")
+
+    @property
+    def maximum_demand(self) -> MaximumDemandRestriction:
+        return self.__built("maximum_demand")
+
+    @property
+    def empty_offer(self) -> EmptyOfferRestriction:
+        return self.__built("empty_offer")
+
+    @property
+    def dispatch_initial_trains(self) -> DispatchInitialTrain:
+        return self.__built("dispatch_initial_trains")
+
+    @property
+    def costs(self) -> np.ndarray:
+        return self.__built("costs")
+
+    @property
+    def geq_constraints(self) -> list[Restriction]:
+        return self.__built("geq_constraints")
+
+    @property
+    def leq_constraints(self) -> list[Restriction]:
+        return self.__built("leq_constraints")
+
+    def __family(self, name: str, build) -> Restrictions:
+        with self.observer.phase(f"restrictions.{name}") as details:
+            family = build()
+            details["rows"] = len(family.restrictions())
+        return family
+
+    def optimize(
+            self,
+            max_time,
+            backend: SolverBackend = None,
+            warm_start: bool = False,
+            mode: OptimizationMode = OptimizationMode.EXACT,
+            progress: ProgressCallback = None
+    ):
+        """
+        Solves the problem with `backend` (Gurobi by default)
+        :param max_time: solver time limit in seconds
+        :param backend: any SolverBackend, e.g. HighsBackend where Gurobi licenses are not available
+        :param warm_start: when True, the GreedyPlanner plan is given to the solver as a MIP start
+        :param mode: OptimizationMode.RELAX_AND_ROUND trades optimality for speed: the plan comes from the
+            continuous relaxation and `outcome.bound` / `outcome.gap` tell how far from optimal it can be.
+            OptimizationMode.COLUMN_GENERATION scales with the trip patterns instead of the variable tensor,
+            for large fleets, and never assembles the model matrix; `warm_start` does not apply to either
+        :param progress: receives the incumbent, bound, gap and node count while the exact model is solved,
+            and stops the solve early by returning True (see optimizer.progress.ProgressStream). Column
+            generation reports each pricing round and stops pricing when asked (see ColumnGeneration.solve).
+            Relax and round only reports its final state: its relaxation can not be stopped.
+        :return: RailroadResult, or None when the solver found no solution
+        """
+        observer = self.observer
+        observer.on_message(repr(self))
+        backend = backend or GurobiBackend()
+        if mode == OptimizationMode.COLUMN_GENERATION:
+            with observer.phase("solve.column_generation", backend=backend.name) as details:
+                decomposition = ColumnGeneration(problem=self, backend=backend)
+                result = decomposition.solve(max_time=max_time, progress=progress)
+                self.outcome = decomposition.outcome
+                details["iterations"] = decomposition.iterations
+        else:
+            with observer.phase("solve.build", backend=backend.name):
+                handle = backend.build(self.model_matrix)
+            if mode == OptimizationMode.RELAX_AND_ROUND:
+                self.outcome = self.__relax_and_round(backend=backend, handle=handle, max_time=max_time)
+                if progress is not None:
+                    progress(SolverProgress(
+                        incumbent=self.outcome.objective,
+                        bound=self.outcome.bound,
+                        nodes=0,
+                        elapsed=self.outcome.solve_time
+                    ))
+            else:
+                start = None
+                if warm_start:
+                    with observer.phase("solve.warm_start"):
+                        start = GreedyPlanner(problem=self).start_values()
+                with observer.phase("solve.run", backend=backend.name) as details:
+                    self.outcome = backend.run(handle, max_time=max_time, start=start, progress=progress)
+                    details["status"] = self.outcome.status.value
+            result = self.build_result(values=self.outcome.values) if self.outcome.has_solution else None
+        if mode != OptimizationMode.EXACT and self.outcome.bound is not None and self.outcome.has_solution:
+            observer.on_message(f"Bound: {self.outcome.bound:.3f} (gap {self.outcome.gap:.2%})")
+        return result
+
+    def __relax_and_round(self, backend: SolverBackend, handle, max_time) -> SolverOutcome:
+        """
+        Solves the relaxation and rounds it. The greedy plan is kept instead when it is feasible and better,
+        or when the rounded plan could not be repaired. When neither is feasible the status is NO_SOLUTION:
+        only an infeasible relaxation proves the model infeasible.
+        """
+        with self.observer.phase("solve.relax", backend=backend.name) as details:
+            relaxed = backend.relax(handle, max_time=max_time)
+            details["status"] = relaxed.status.value
+        if not relaxed.has_solution:
+            return relaxed
+
+        begin = time.perf_counter()
+        with self.observer.phase("solve.rounding"):
+            rounding = RelaxAndRound(model=self.model_matrix)
+            candidates = [rounding.round(relaxed.values), GreedyPlanner(problem=self).start_values()]
+            feasible = [values for values in candidates if rounding.is_feasible(values)]
+            values = max(feasible, key=lambda v: self.model_matrix.costs @ v) if feasible else None
+        rounding_time = time.perf_counter() - begin
+
+        return SolverOutcome(
+            status=SolverStatus.FEASIBLE if values is not None else SolverStatus.NO_SOLUTION,
+            values=values,
+            objective=float(self.model_matrix.costs @ values) if values is not None else None,
+            build_time=relaxed.build_time,
+            solve_time=relaxed.solve_time + rounding_time,
+            bound=relaxed.objective
         )
 
-        for r in self.geq_constraints:
-            model.addConstr(gp.quicksum([x[i] * r.coefficients[i] for i in labels]) <= r.resource)
-        for r in self.leq_constraints:
-            model.addConstr(gp.quicksum([x[i] * r.coefficients[i] for i in labels]) >= r.resource)
-
-        print(model.optimize())
-
-        if model.status == gp.GRB.OPTIMAL or model.status == gp.GRB.TIME_LIMIT:
-            print("="*50)
-            matrix = np.zeros(self.capacity.cardinality)
-            for label in labels:
-                matrix[label] = x[label].X
-            result = RailroadResult(
-                optimization_result=matrix,
-                load_terminals=self.maximum_demand.loaded_origins,
-                unload_terminals=self.maximum_demand.loaded_destinations,
-                demand=self.demand,
-                transit_times=self.time_horizon.transit_matrix
+    def build_result(self, values: np.ndarray) -> RailroadResult:
+        """
+        Builds the RailroadResult of a solution given as one value per model column
+        :return:
+        """
+        with self.observer.phase("result.build"):
+            if self.train_classes is None:
+                return self.build_plan_result(plan=SparsePlan.from_columns(index=self.variable_index, values=values))
+            matrix = disaggregate(
+                solution=self.model_matrix.expand(values),
+                classes=self.train_classes,
+                empty_origins=self.structure.empty_origins,
+                cycle_times=self.cycle_table.cycle_times,
+                time_horizon=self.horizon
             )
+            result = self.build_plan_result(plan=SparsePlan.from_dense(matrix))
+            result.needs_repair = bool(np.any(result.time_by_train > self.horizon + 1e-9))
+            if result.needs_repair:
+                self.observer.on_message("Some trains exceed the time horizon after the split of their classes")
             return result
 
+    def build_plan_result(self, plan: SparsePlan) -> RailroadResult:
+        """
+        Builds the RailroadResult of a plan of trips by train, shape (trains, U, L, U)
+        :return:
+        """
+        result = RailroadResult(
+            plan=plan,
+            load_terminals=list(self.structure.loaded_origins),
+            unload_terminals=list(self.structure.loaded_destinations),
+            demand=self.demand,
+            transit_times=self.cycle_table.transit_matrix,
+            cycle_times=self.cycle_table.cycle_times,
+            observer=self.observer
+        )
+        return result
+
     def labels(self):
-        # Building vars label
-        labels = []
-        for n in range(self.trains):
-            for i, e_origin in enumerate(self.capacity.empty_origins):
-                for j, l_origin in enumerate(self.capacity.loaded_origins):
-                    for k, l_destination in enumerate(self.capacity.loaded_destinations):
-                        # label = f"train_{n}-empty_{i}-from_{j}_to-{k}"
-                        label = (n, i, j, k)
-                        labels.append(label)
-        return labels
+        """
+        Variable labels (n, i, j, k), in model column order. Built once from the variable index.
+        :return:
+        """
+        if self.__labels is None:
+            self.__labels = [tuple(label) for label in self.variable_index.to_labels().tolist()]
+        return self.__labels
 
     def __repr__(self):
-        repr = f"Problem with {len(self.geq_constraints+self.leq_constraints)} constraints and {len(self.labels())} variables\n\n"
+        if self.__model_matrix is None:
+            # the model is not assembled yet, nor forced to be
+            return f"Problem with {len(self.variable_index)} variables\n\n"
+        repr = f"Problem with {self.model_matrix.constraints} constraints and {len(self.variable_index)} variables\n\n"
 
         return repr
 
     def complete_repr(self):
-        repr = f"Problem with {len(self.geq_constraints + self.leq_constraints)} constraints and {len(self.labels())} variables\n\n"
-        for r in self.geq_constraints+self.leq_constraints:
+        repr = f"Problem with {self.model_matrix.constraints} constraints and {len(self.variable_index)} variables\n\n"
+        matrix = self.model_matrix.coefficients
+        for row, r in enumerate(self.geq_constraints + self.leq_constraints):
             lhs = ""
-            for i in self.labels():
-                if r.coefficients[i] != 0:
-                    lhs += str(r.coefficients[i]) + f"*x_{'|'.join([str(x) for x in i])} " + "\t\t"
+            columns = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+            coefficients = matrix.data[matrix.indptr[row]:matrix.indptr[row + 1]]
+            order = np.argsort(columns)
+            labels = self.variable_index.to_labels(columns[order])
+            for coefficient, i in zip(coefficients[order], labels):
+                lhs += str(coefficient) + f"*x_{'|'.join([str(x) for x in i])} " + "\t\t"
             lhs = lhs[:-1].replace("\t\t", "\t+")
             repr += f"{lhs} {r.sense}= {r.resource} \n"
 
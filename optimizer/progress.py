@@ -0,0 +1,74 @@
+"""
+This file implements ProgressStream: the progress of a solve running in a worker thread as an async
+iterator, for asyncio services such as a dispatch UI showing live plans.
+
+    stream = ProgressStream(stop_gap=0.01)
+    solve = asyncio.create_task(stream.run(problem.optimize, max_time=600))
+    async for progress in stream:
+        show(progress.incumbent, progress.bound, progress.gap)
+    result = await solve
+
+The stream is the `progress` callback of the solve: each SolverProgress is handed to the event loop
+thread-safely, and the solve is stopped early - keeping its best incumbent - once `stop` is called or the
+gap reaches `stop_gap`.
+"""
+import asyncio
+import threading
+from typing import Callable, Optional
+from optimizer.solvers.solver_backend import SolverProgress
+
+
+class ProgressStream:
+    __end = object()
+
+    def __init__(self, stop_gap: float = None):
+        """
+        Must be created in the event loop that iterates it
+        :param stop_gap: relative gap at which the solve is stopped, None to let it run
+        """
+        self.stop_gap = stop_gap
+        self.__loop = asyncio.get_running_loop()
+        self.__queue: asyncio.Queue = asyncio.Queue()
+        self.__stopped = threading.Event()
+        self.last: Optional[SolverProgress] = None
+
+    def __call__(self, progress: SolverProgress) -> bool:
+        """
+        Progress callback, called from the solving thread
+        :return: True when the solve should stop
+        """
+        self.__loop.call_soon_threadsafe(self.__queue.put_nowait, progress)
+        reached = self.stop_gap is not None and progress.gap is not None and progress.gap <= self.stop_gap
+        return self.__stopped.is_set() or reached
+
+    def stop(self):
+        """
+        Asks the solve to stop at its next progress event
+        """
+        self.__stopped.set()
+
+    def close(self):
+        """
+        Ends the iteration once the queued events are consumed
+        """
+        self.__loop.call_soon_threadsafe(self.__queue.put_nowait, self.__end)
+
+    async def run(self, solve: Callable, **kwargs):
+        """
+        Runs `solve(progress=self, **kwargs)` in a worker thread and closes the stream when it returns
+        :return: what `solve` returns
+        """
+        try:
+            return await asyncio.to_thread(solve, progress=self, **kwargs)
+        finally:
+            self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> SolverProgress:
+        progress = await self.__queue.get()
+        if progress is self.__end:
+            raise StopAsyncIteration
+        self.last = progress
+        return progress
@@ -1,5 +1,5 @@
 import numpy as np
-from optimizer.restrictions.railroad_elements import Flow, RailroadProblemTemplate
+from optimizer.restrictions.railroad_elements import Flow, RailroadProblemTemplate, ProblemStructure
 from optimizer.restrictions.restrictions import Restrictions, RestrictionType, Restriction
 
 
@@ -7,28 +7,36 @@ class CapacityRestrictions(RailroadProblemTemplate, Restrictions):
     def __init__(
             self,
             trains: int,
-            flows: list[Flow]
+            flows: list[Flow],
+            structure: ProblemStructure = None
     ):
         super().__init__(
             trains=trains,
-            flows=flows
+            flows=flows,
+            structure=structure
         )
         self.__restrictions = self.__build_restrictions(flows=flows)
 
     def __build_restrictions(self, flows):
         restrictions = []
+        flows_by_origin = [[] for _ in self.loaded_origins]
+        for flow in flows:
+            flows_by_origin[self.loaded_origin_positions[flow.origin.identifier]].append(flow)
         for j, origin in enumerate(self.loaded_origins):
-            matrix = np.zeros(self.cardinality)
-            filtered_flows = [flow for flow in flows if flow.origin == origin]
+            filtered_flows = flows_by_origin[j]
             if filtered_flows:
+                indices, values = [], []
                 for flow in filtered_flows:
-                    coefficient = flow.train_volume
-                    k = self.loaded_destinations.index(flow.destination)
-                    matrix[:, :, j, k] = coefficient
+                    k = self.loaded_destination_positions[flow.destination.identifier]
+                    positions = self.positions(loaded_origins=j, loaded_destinations=k)
+                    indices.append(positions)
+                    values.append(np.full(len(positions), flow.train_volume))
                 restriction = Restriction(
-                    coefficients=matrix,
+                    indices=np.concatenate(indices),
+                    values=np.concatenate(values),
                     sense=self.restriction_type.value,
-                    resource=origin.capacity
+                    resource=origin.capacity,
+                    shape=self.cardinality
                 )
                 restrictions.append(restriction)
         return restrictions
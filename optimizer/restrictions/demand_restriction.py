@@ -1,40 +1,52 @@
 import numpy as np
-from optimizer.restrictions.railroad_elements import Flow, Demand, RailroadProblemTemplate
+from optimizer.restrictions.railroad_elements import Flow, Demand, RailroadProblemTemplate, ProblemStructure
 from optimizer.restrictions.restrictions import Restrictions, RestrictionType, Restriction
 
 
+def group_demands_by_flow(template: RailroadProblemTemplate, demands: list[Demand]):
+    """
+    Keeps the first demand of each (origin, destination) pair, ordered by origin and then destination
+    position, and returns the variable positions covered by each pair
+    :return: demands, one per pair, and an array with one row of flat tensor positions per pair
+    """
+    if not demands:
+        return [], np.zeros((0, 0), dtype=np.int64)
+    u = len(template.loaded_destinations)
+    j = np.array([template.loaded_origin_positions[d.flow.origin.identifier] for d in demands])
+    k = np.array([template.loaded_destination_positions[d.flow.destination.identifier] for d in demands])
+    _, first = np.unique(j * u + k, return_index=True)
+    pairs = template.positions(loaded_origins=0, loaded_destinations=0)
+    positions = pairs[np.newaxis, :] + (j[first] * u + k[first])[:, np.newaxis]
+    return [demands[d] for d in first], positions
+
+
 class MinimumDemandRestriction(RailroadProblemTemplate, Restrictions):
     def __init__(
             self,
             trains,
             demands: list[Demand],
+            structure: ProblemStructure = None
     ):
         super().__init__(
             trains=trains,
-            flows=[d.flow for d in demands]
+            flows=[d.flow for d in demands],
+            structure=structure
         )
         self.__restrictions = self.__build_restrictions(demands=demands)
 
     def __build_restrictions(self, demands: list[Demand]) -> list[Restriction]:
-        restrictions = []
-        for j, origin in enumerate(self.loaded_origins):
-            for k, destination in enumerate(self.loaded_destinations):
-                matrix = np.zeros(self.cardinality)
-                filtered_bands = [
-                    d
-                    for d in demands
-                    if d.flow.origin == origin and
-                       d.flow.destination == destination
-                ]
-                if filtered_bands and filtered_bands[0].minimum:
-                    demand = filtered_bands[0]
-                    matrix[:, :, j, k] = demand.flow.train_volume
-                    restriction = Restriction(
-                        coefficients=matrix,
-                        sense=self.restriction_type.value,
-                        resource=demand.minimum
-                    )
-                    restrictions.append(restriction)
+        grouped, positions = group_demands_by_flow(template=self, demands=demands)
+        restrictions = [
+            Restriction(
+                indices=indices,
+                values=demand.flow.train_volume,
+                sense=self.restriction_type.value,
+                resource=demand.minimum,
+                shape=self.cardinality
+            )
+            for demand, indices in zip(grouped, positions)
+            if demand.minimum
+        ]
         return restrictions
 
     def restrictions(self) -> list[Restriction]:
@@ -49,34 +61,28 @@ class MaximumDemandRestriction(RailroadProblemTemplate, Restrictions):
     def __init__(
             self,
             trains,
-            demands: list[Demand]
+            demands: list[Demand],
+            structure: ProblemStructure = None
     ):
         super().__init__(
             trains=trains,
-            flows=[d.flow for d in demands]
+            flows=[d.flow for d in demands],
+            structure=structure
         )
         self.__restrictions = self.__build_restrictions(demands=demands)
 
     def __build_restrictions(self, demands: list[Demand]) -> list[Restriction]:
-        restrictions = []
-        for j, origin in enumerate(self.loaded_origins):
-            for k, destination in enumerate(self.loaded_destinations):
-                matrix = np.zeros(self.cardinality)
-                filtered_bands = [
-                    d
-                    for d in demands
-                    if d.flow.origin == origin and
-                       d.flow.destination == destination
-                ]
-                if filtered_bands:
-                    demand = filtered_bands[0]
-                    matrix[:, :, j, k] = demand.flow.train_volume
-                    restriction = Restriction(
-                        coefficients=matrix,
-                        sense=self.restriction_type.value,
-                        resource=demand.maximum
-                    )
-                    restrictions.append(restriction)
+        grouped, positions = group_demands_by_flow(template=self, demands=demands)
+        restrictions = [
+            Restriction(
+                indices=indices,
+                values=demand.flow.train_volume,
+                sense=self.restriction_type.value,
+                resource=demand.maximum,
+                shape=self.cardinality
+            )
+            for demand, indices in zip(grouped, positions)
+        ]
         return restrictions
 
     def restrictions(self) -> list[Restriction]:
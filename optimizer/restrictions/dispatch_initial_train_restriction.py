@@ -1,19 +1,29 @@
-import numpy as np
-from optimizer.restrictions.railroad_elements import Flow, RailroadProblemTemplate
+from optimizer.restrictions.railroad_elements import Flow, RailroadProblemTemplate, ProblemStructure
 from optimizer.restrictions.restrictions import Restrictions, RestrictionType, Restriction
+from optimizer.train_classes import TrainClass
 
 
 class DispatchInitialTrain(RailroadProblemTemplate, Restrictions):
     def __init__(
             self,
             trains: int,
-            flows: list[Flow]
+            flows: list[Flow],
+            train_classes: list[TrainClass] = None,
+            structure: ProblemStructure = None
     ):
+        """
+        :param train_classes: when given, the trains axis indexes these classes and each class must
+            dispatch all of its trains from their initial position
+        """
         super().__init__(
             trains=trains,
-            flows=flows
+            flows=flows,
+            structure=structure
         )
-        self.__restrictions = self.__build_restrictions()
+        if train_classes is None:
+            self.__restrictions = self.__build_restrictions()
+        else:
+            self.__restrictions = self.__build_class_restrictions(train_classes=train_classes)
 
     def __build_restrictions(self):
         """
@@ -26,17 +36,35 @@ class DispatchInitialTrain(RailroadProblemTemplate, Restrictions):
         already_counted_trains = 0
         for i, unload_point in enumerate(self.empty_origins):
             for t in range(unload_point.initial_trains):
-                matrix = np.zeros(self.cardinality)
-                matrix[t+already_counted_trains, i, :, :] += 1     # departure trains
+                departures = self.positions(trains=t+already_counted_trains, empty_origins=i)
                 restriction = Restriction(
-                    coefficients=matrix,
+                    indices=departures,
+                    values=1,
                     sense=self.restriction_type.value,
-                    resource=1
+                    resource=1,
+                    shape=self.cardinality
                 )
                 restrictions.append(restriction)
             already_counted_trains += unload_point.initial_trains
         return restrictions
 
+    def __build_class_restrictions(self, train_classes: list[TrainClass]):
+        restrictions = []
+        for c, train_class in enumerate(train_classes):
+            if train_class.start is None:
+                continue
+            i = self.empty_origin_positions[train_class.start.identifier]
+            departures = self.positions(trains=c, empty_origins=i)
+            restriction = Restriction(
+                indices=departures,
+                values=1,
+                sense=self.restriction_type.value,
+                resource=train_class.size,
+                shape=self.cardinality
+            )
+            restrictions.append(restriction)
+        return restrictions
+
     def restrictions(self) -> list[Restriction]:
         return self.__restrictions
 
@@ -1,5 +1,5 @@
 import numpy as np
-from optimizer.restrictions.railroad_elements import Flow, RailroadProblemTemplate
+from optimizer.restrictions.railroad_elements import Flow, RailroadProblemTemplate, ProblemStructure
 from optimizer.restrictions.restrictions import Restrictions, RestrictionType, Restriction
 
 
@@ -7,11 +7,13 @@ class EmptyOfferRestriction(RailroadProblemTemplate, Restrictions):
     def __init__(
             self,
             trains: int,
-            flows: list[Flow]
+            flows: list[Flow],
+            structure: ProblemStructure = None
     ):
         super().__init__(
             trains=trains,
-            flows=flows
+            flows=flows,
+            structure=structure
         )
         self.__restrictions = self.__build_restrictions()
 
@@ -24,13 +26,14 @@ class EmptyOfferRestriction(RailroadProblemTemplate, Restrictions):
         """
         restrictions = []
         for i, unload_point in enumerate(self.empty_origins):
-            matrix = np.zeros(self.cardinality)
-            matrix[:, i, :, :] += 1     # departure trains
-            matrix[:, :, :, i] += -1    # arrived trains
+            departures = self.positions(empty_origins=i)
+            arrivals = self.positions(loaded_destinations=i)
             restriction = Restriction(
-                coefficients=matrix,
+                indices=np.concatenate([departures, arrivals]),
+                values=np.concatenate([np.ones(len(departures)), -np.ones(len(arrivals))]),
                 sense=self.restriction_type.value,
-                resource=unload_point.initial_trains
+                resource=unload_point.initial_trains,
+                shape=self.cardinality
             )
             restrictions.append(restriction)
         return restrictions
@@ -1,5 +1,4 @@
-import numpy as np
-from optimizer.restrictions.railroad_elements import Flow, ExchangeBand, RailroadProblemTemplate
+from optimizer.restrictions.railroad_elements import Flow, ExchangeBand, RailroadProblemTemplate, ProblemStructure
 from optimizer.restrictions.restrictions import Restrictions, RestrictionType, Restriction
 
 
@@ -8,25 +7,30 @@ class ExchangeRestriction(RailroadProblemTemplate, Restrictions):
             self,
             trains,
             bands: list[ExchangeBand],
-            flows: list[Flow]
+            flows: list[Flow],
+            structure: ProblemStructure = None
     ):
         super().__init__(
             trains=trains,
-            flows=flows
+            flows=flows,
+            structure=structure
         )
         self.__restrictions = self.__build_restrictions(bands=bands)
 
     def __build_restrictions(self, bands) -> list[Restriction]:
         restrictions = []
+        bands_by_node = {}
+        for band in bands:
+            bands_by_node.setdefault(band.node.identifier, band)
         for k, node in enumerate(self.loaded_destinations):
-            matrix = np.zeros(self.cardinality)
-            filtered_bands = [b for b in bands if b.node == node]
-            if filtered_bands:
-                matrix[:, :, :, k] = 1
+            band = bands_by_node.get(node.identifier)
+            if band is not None:
                 restriction = Restriction(
-                    coefficients=matrix,
+                    indices=self.positions(loaded_destinations=k),
+                    values=1,
                     sense=self.restriction_type.value,
-                    resource=filtered_bands[0].band
+                    resource=band.band,
+                    shape=self.cardinality
                 )
                 restrictions.append(restriction)
         return restrictions
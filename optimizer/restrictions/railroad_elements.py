@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from types import MappingProxyType
+import numpy as np
 
 
 def node_id_generator():
@@ -50,36 +52,192 @@ class Demand:
     maximum: float
 
 
-class RailroadProblemTemplate:
+def collect_nodes(
+        demands: list[Demand],
+        transit_times: list[TransitTime] = (),
+        exchange_bands: list[ExchangeBand] = ()
+) -> list[Node]:
+    """
+    Every node referenced by an instance, in identifier order
+    :return:
+    """
+    nodes = {}
+    for demand in demands:
+        nodes[demand.flow.origin.identifier] = demand.flow.origin
+        nodes[demand.flow.destination.identifier] = demand.flow.destination
+    for transit in transit_times:
+        nodes[transit.origin.identifier] = transit.origin
+        nodes[transit.destination.identifier] = transit.destination
+    for band in exchange_bands:
+        nodes[band.node.identifier] = band.node
+    return [nodes[identifier] for identifier in sorted(nodes)]
+
+
+class ProblemStructure:
+    """
+    Immutable index layout of a problem: node orderings for each role, node identifier -> position lookup
+    tables, flow arrays and the variable tensor cardinality (trains, U, L, U).
+    It is built once and shared by every restriction family, so all of them agree on the same layout.
+    """
     def __init__(
             self,
             trains: int,
             flows: list[Flow]
     ):
         self.__trains = trains
-        self.__empty_origins = self.build_unload_points(flows=flows)
-        self.__loaded_origins = self.build_load_points(flows=flows)
-        self.__loaded_destinations = self.build_unload_points(flows=flows)
+        self.__flows = tuple(flows)
+        self.__empty_origins = tuple(self.build_unload_points(flows=flows))
+        self.__loaded_origins = tuple(self.build_load_points(flows=flows))
+        self.__loaded_destinations = tuple(self.build_unload_points(flows=flows))
         u = len(self.__loaded_destinations)
         l = len(self.__loaded_origins)
         self.__cardinality = (self.__trains, u, l, u)
+        self.__empty_origin_positions = MappingProxyType(self.build_positions(nodes=self.__empty_origins))
+        self.__loaded_origin_positions = MappingProxyType(self.build_positions(nodes=self.__loaded_origins))
+        self.__loaded_destination_positions = MappingProxyType(
+            self.build_positions(nodes=self.__loaded_destinations)
+        )
+        self.__flow_origins = self.__readonly([self.__loaded_origin_positions[f.origin.identifier] for f in flows])
+        self.__flow_destinations = self.__readonly(
+            [self.__loaded_destination_positions[f.destination.identifier] for f in flows]
+        )
+        self.__flow_volumes = self.__readonly([f.train_volume for f in flows], dtype=float)
+
+    @staticmethod
+    def __readonly(values, dtype=np.int64) -> np.ndarray:
+        array = np.array(values, dtype=dtype)
+        array.setflags(write=False)
+        return array
 
     @property
-    def loaded_origins(self):
+    def trains(self) -> int:
+        return self.__trains
+
+    @property
+    def flows(self) -> tuple[Flow, ...]:
+        return self.__flows
+
+    @property
+    def loaded_origins(self) -> tuple[Node, ...]:
         return self.__loaded_origins
 
     @property
-    def loaded_destinations(self):
+    def loaded_destinations(self) -> tuple[Node, ...]:
         return self.__loaded_destinations
 
     @property
-    def empty_origins(self):
+    def empty_origins(self) -> tuple[Node, ...]:
         return self.__empty_origins
 
     @property
-    def cardinality(self):
+    def cardinality(self) -> tuple:
         return self.__cardinality
 
+    @property
+    def empty_origin_positions(self) -> MappingProxyType:
+        """
+        Node identifier -> position in empty_origins
+        """
+        return self.__empty_origin_positions
+
+    @property
+    def loaded_origin_positions(self) -> MappingProxyType:
+        """
+        Node identifier -> position in loaded_origins
+        """
+        return self.__loaded_origin_positions
+
+    @property
+    def loaded_destination_positions(self) -> MappingProxyType:
+        """
+        Node identifier -> position in loaded_destinations
+        """
+        return self.__loaded_destination_positions
+
+    @property
+    def flow_origins(self) -> np.ndarray:
+        """
+        Position j, in loaded_origins, of the origin of each flow
+        """
+        return self.__flow_origins
+
+    @property
+    def flow_destinations(self) -> np.ndarray:
+        """
+        Position k, in loaded_destinations, of the destination of each flow
+        """
+        return self.__flow_destinations
+
+    @property
+    def flow_volumes(self) -> np.ndarray:
+        """
+        Train volume of each flow
+        """
+        return self.__flow_volumes
+
+    def positions(
+            self,
+            trains=slice(None),
+            empty_origins=slice(None),
+            loaded_origins=slice(None),
+            loaded_destinations=slice(None)
+    ) -> np.ndarray:
+        """
+        Flat positions, in the variable tensor, of every cell selected by the given axes.
+        Each axis accepts the same selectors as numpy indexing (int, slice or array of indices).
+        :return:
+        """
+        selections = (trains, empty_origins, loaded_origins, loaded_destinations)
+        axes = [
+            np.atleast_1d(np.arange(size)[selection])
+            for size, selection in zip(self.cardinality, selections)
+        ]
+        return np.ravel_multi_index(np.ix_(*axes), self.cardinality).ravel()
+
+    def fitting_variables(self, transit_times: list[TransitTime], time_horizon: float) -> np.ndarray:
+        """
+        Mask of the variables (n, i, j, k) whose trip fits the time horizon: the transits timing the empty
+        move i->j (j->i transit) and the loaded trip j->k take no longer than it. Any other variable is zero
+        in every solution. Load and unload processes are left out, they change with node capacities.
+        :return: boolean array with the problem cardinality
+        """
+        transit_matrix = np.zeros((len(self.loaded_origins), len(self.loaded_destinations)))
+        for transit in transit_times:
+            j = self.loaded_origin_positions.get(transit.origin.identifier)
+            k = self.loaded_destination_positions.get(transit.destination.identifier)
+            if j is not None and k is not None:
+                transit_matrix[j, k] = transit.time
+        trip_times = transit_matrix.T[:, :, np.newaxis] + transit_matrix[np.newaxis, :, :]
+        return np.broadcast_to(trip_times <= time_horizon, self.cardinality)
+
+    def feasible_variables(self, transit_times: list[TransitTime]) -> np.ndarray:
+        """
+        Mask of the variables (n, i, j, k) of timed trips: the loaded trip j->k must be backed by a flow and
+        the empty train must be able to reach j from i, i.e. i is the node j itself or a transit time between
+        j and i is known (the empty return is timed with the j->i transit).
+        The other variables are valid in the model, as zero-time moves, so dropping them changes it (see
+        RailroadOptimizationProblem structural_pruning).
+        :return: boolean array with the problem cardinality
+        """
+        u, l = len(self.loaded_destinations), len(self.loaded_origins)
+        has_flow = np.zeros((l, u), dtype=bool)
+        has_flow[self.flow_origins, self.flow_destinations] = True
+        reachable = np.zeros((u, l), dtype=bool)
+        for i, node in enumerate(self.empty_origins):
+            if node.identifier in self.loaded_origin_positions:
+                reachable[i, self.loaded_origin_positions[node.identifier]] = True
+        for transit in transit_times:
+            j = self.loaded_origin_positions.get(transit.origin.identifier)
+            i = self.empty_origin_positions.get(transit.destination.identifier)
+            if j is not None and i is not None:
+                reachable[i, j] = True
+        mask = reachable[:, :, np.newaxis] & has_flow[np.newaxis, :, :]
+        return np.broadcast_to(mask, self.cardinality)
+
+    @staticmethod
+    def build_positions(nodes: list[Node]) -> dict[int, int]:
+        return {node.identifier: position for position, node in enumerate(nodes)}
+
     @staticmethod
     def build_unload_points(flows: list[Flow]):
         nodes = set([f.destination for f in flows])
@@ -93,3 +251,62 @@ class RailroadProblemTemplate:
         return nodes
 
 
+class RailroadProblemTemplate:
+    def __init__(
+            self,
+            trains: int,
+            flows: list[Flow],
+            structure: ProblemStructure = None
+    ):
+        """
+        :param structure: layout shared with the other restriction families of the problem. When None, it
+            is built from `trains` and `flows`.
+        """
+        if structure is None:
+            structure = ProblemStructure(trains=trains, flows=flows)
+        self.__structure = structure
+
+    @property
+    def structure(self) -> ProblemStructure:
+        return self.__structure
+
+    @property
+    def loaded_origins(self):
+        return self.__structure.loaded_origins
+
+    @property
+    def loaded_destinations(self):
+        return self.__structure.loaded_destinations
+
+    @property
+    def empty_origins(self):
+        return self.__structure.empty_origins
+
+    @property
+    def cardinality(self):
+        return self.__structure.cardinality
+
+    @property
+    def empty_origin_positions(self) -> MappingProxyType:
+        return self.__structure.empty_origin_positions
+
+    @property
+    def loaded_origin_positions(self) -> MappingProxyType:
+        return self.__structure.loaded_origin_positions
+
+    @property
+    def loaded_destination_positions(self) -> MappingProxyType:
+        return self.__structure.loaded_destination_positions
+
+    def positions(self, **selections) -> np.ndarray:
+        return self.__structure.positions(**selections)
+
+    def fitting_variables(self, transit_times: list[TransitTime], time_horizon: float) -> np.ndarray:
+        return self.__structure.fitting_variables(transit_times=transit_times, time_horizon=time_horizon)
+
+    def feasible_variables(self, transit_times: list[TransitTime]) -> np.ndarray:
+        return self.__structure.feasible_variables(transit_times=transit_times)
+
+    build_positions = staticmethod(ProblemStructure.build_positions)
+    build_unload_points = staticmethod(ProblemStructure.build_unload_points)
+    build_load_points = staticmethod(ProblemStructure.build_load_points)
@@ -5,7 +5,9 @@ railroad optimization problem - ROP
 """
 
 from abc import abstractmethod, ABC
+from typing import Callable
 import numpy as np
+from scipy import sparse
 from dataclasses import dataclass
 from enum import Enum
 
@@ -19,24 +21,86 @@ class RestrictionType(Enum):
 
 @dataclass
 class Restriction:
-    coefficients: np.ndarray
+    """
+    A single constraint stored in sparse form: `indices` are flat positions in the variable tensor of
+    shape `shape` and `values` are the coefficients at those positions. Repeated positions are summed
+    and zeros are dropped, so `indices` is always sorted and unique.
+    """
+    indices: np.ndarray
+    values: np.ndarray
     sense: str
     resource: float
+    shape: tuple
+
+    def __post_init__(self):
+        indices = np.asarray(self.indices, dtype=np.int64).ravel()
+        values = np.broadcast_to(np.asarray(self.values, dtype=float), indices.shape)
+        positions, inverse = np.unique(indices, return_inverse=True)
+        summed = np.bincount(inverse, weights=values, minlength=len(positions))
+        nonzero = summed != 0
+        self.indices = positions[nonzero]
+        self.values = summed[nonzero]
+        self.shape = tuple(self.shape)
+
+    @classmethod
+    def from_dense(cls, coefficients: np.ndarray, sense: str, resource: float) -> "Restriction":
+        flat = coefficients.ravel()
+        indices = np.flatnonzero(flat)
+        return cls(
+            indices=indices,
+            values=flat[indices],
+            sense=sense,
+            resource=resource,
+            shape=coefficients.shape
+        )
 
-    def __vectorize(self, data):
-        for dimension in data:
-            if isinstance(dimension, np.ndarray):
-                for d in self.__vectorize(dimension):
-                    yield d
-            else:
-                yield dimension
-
-    def to_vector(self):
-        data = list(self.__vectorize(self.coefficients))
-        data = np.array(data)
+    @property
+    def coefficients(self) -> np.ndarray:
+        """
+        Dense coefficient tensor, built on request
+        :return:
+        """
+        return self.to_vector().reshape(self.shape)
+
+    def to_vector(self) -> np.ndarray:
+        """
+        Dense coefficients flattened in the variable tensor order
+        :return:
+        """
+        data = np.zeros(int(np.prod(self.shape)))
+        data[self.indices] = self.values
         return data
 
 
+def stack_restrictions(
+        restrictions: list[Restriction],
+        columns: int,
+        mapping: Callable[[np.ndarray], np.ndarray] = None
+) -> sparse.csr_matrix:
+    """
+    Stacks the sparse entries of the restrictions as the rows of a single CSR matrix
+    :param columns: number of columns of the matrix
+    :param mapping: maps flat positions of the variable tensor to columns, -1 for the positions left out,
+        e.g. VariableIndex.from_positions. The positions are the columns when None.
+    :return:
+    """
+    counts = np.array([len(r.indices) for r in restrictions], dtype=np.int64)
+    if restrictions:
+        indices = np.concatenate([r.indices for r in restrictions])
+        data = np.concatenate([r.values for r in restrictions])
+    else:
+        indices, data = np.zeros(0, dtype=np.int64), np.zeros(0)
+    if mapping is not None:
+        indices = mapping(indices)
+        kept = indices >= 0
+        rows = np.repeat(np.arange(len(restrictions)), counts)
+        counts = np.bincount(rows[kept], minlength=len(restrictions))
+        indices, data = indices[kept], data[kept]
+    # the indices of each restriction are sorted and unique, and so are the columns they map to
+    indptr = np.concatenate([[0], np.cumsum(counts)])
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(restrictions), columns))
+
+
 class Restrictions(ABC):
     @abstractmethod
     def restrictions(self) -> list[Restriction]:
@@ -46,15 +110,22 @@ class Restrictions(ABC):
     def restriction_type(self) -> RestrictionType:
         pass
 
+    @property
+    def sparse_coefficients_matrix(self) -> sparse.csr_matrix:
+        """
+        Constraint coefficients as a CSR matrix, one row per restriction, assembled from the sparse entries
+        of each restriction
+        :return:
+        """
+        return stack_restrictions(restrictions=self.restrictions(), columns=int(np.prod(self.cardinality)))
+
     @property
     def coefficients_matrix(self) -> np.ndarray:
         """
         This method build constraint coefficients as a Matrix
         :return:
         """
-        a = [r.to_vector() for r in self.restrictions()]
-        a = np.array(a)
-        return a
+        return self.sparse_coefficients_matrix.toarray()
 
     @property
     def resource_vector(self) -> np.ndarray:
@@ -65,5 +136,3 @@ class Restrictions(ABC):
     @abstractmethod
     def cardinality(self):
         pass
-
-
@@ -1,6 +1,36 @@
 import numpy as np
-from optimizer.restrictions.railroad_elements import Flow, TransitTime, RailroadProblemTemplate
+from optimizer.restrictions.railroad_elements import Flow, TransitTime, RailroadProblemTemplate, ProblemStructure
 from optimizer.restrictions.restrictions import Restrictions, RestrictionType, Restriction
+from optimizer.train_classes import TrainClass
+
+
+class CycleTimeTable:
+    """
+    Time spent by each trip, computed once for the whole problem:
+
+        loaded[j, k]        transit j->k plus unload process of the train volume at k
+        empty_return[j, i]  transit j->i, used for the empty move i->j, plus load process at j
+        cycle_times[i, j, k] = empty_return[j, i] + loaded[j, k]
+
+    Load and unload processes are the train volume divided by the node rate (capacity / time horizon).
+    """
+    def __init__(self, structure: ProblemStructure, transit_times: list[TransitTime], time_horizon: int):
+        l = len(structure.loaded_origins)
+        u = len(structure.loaded_destinations)
+        self.transit_matrix = np.zeros((l, u))
+        for transit in transit_times:
+            j = structure.loaded_origin_positions.get(transit.origin.identifier)
+            k = structure.loaded_destination_positions.get(transit.destination.identifier)
+            if j is not None and k is not None:
+                self.transit_matrix[j, k] = transit.time
+        self.train_volumes = np.zeros((l, u))
+        self.train_volumes[structure.flow_origins, structure.flow_destinations] = structure.flow_volumes
+
+        load_rates = np.array([n.capacity for n in structure.loaded_origins], dtype=float) / time_horizon
+        unload_rates = np.array([n.capacity for n in structure.loaded_destinations], dtype=float) / time_horizon
+        self.loaded = self.transit_matrix + self.train_volumes / unload_rates[np.newaxis, :]
+        self.empty_return = self.transit_matrix + self.train_volumes / load_rates[:, np.newaxis]
+        self.cycle_times = self.empty_return.T[:, :, np.newaxis] + self.loaded[np.newaxis, :, :]
 
 
 class TimeHorizonRestriction(RailroadProblemTemplate, Restrictions):
@@ -9,70 +39,59 @@ class TimeHorizonRestriction(RailroadProblemTemplate, Restrictions):
             trains,
             transit_times: list[TransitTime],
             flows: list[Flow],
-            time_horizon: int
+            time_horizon: int,
+            train_classes: list[TrainClass] = None,
+            structure: ProblemStructure = None,
+            cycle_table: CycleTimeTable = None
     ):
+        """
+        :param train_classes: when given, the trains axis indexes these classes and each class shares
+            the time horizon of all its trains
+        :param cycle_table: cycle times already computed for the same structure, transit times and time
+            horizon. When None, they are computed here.
+        """
         super().__init__(
             trains=trains,
-            flows=flows
-        )
-        self.__restrictions = self.__build_restrictions(
-            transit_times=transit_times,
-            time_horizon=time_horizon,
-            flows=flows
+            flows=flows,
+            structure=structure
         )
+        self.__train_classes = train_classes
+        if cycle_table is None:
+            cycle_table = CycleTimeTable(
+                structure=self.structure,
+                transit_times=transit_times,
+                time_horizon=time_horizon
+            )
+        self.cycle_table = cycle_table
+        self.transit_matrix = self.cycle_table.transit_matrix
+        self.__restrictions = self.__build_restrictions(time_horizon=time_horizon)
 
-    def __build_restrictions(
-            self,
-            transit_times: list[TransitTime],
-            time_horizon: int,
-            flows: list[Flow]
-    ) -> list[Restriction]:
+    def __build_restrictions(self, time_horizon: int) -> list[Restriction]:
         restrictions = []
-        transit_matrix = self.__build_transit_matrix(transit_times=transit_times)
-        train_volumes = self.__build_train_volumes(flows=flows)
-        self.transit_matrix = transit_matrix
+        cycle_times = self.cycle_table.cycle_times.ravel()
         for n in range(self.cardinality[0]):
-            matrix = np.zeros(self.cardinality)
-            for j, load_point in enumerate(self.loaded_origins):
-                for k, unload_destination in enumerate(self.loaded_destinations):
-                    time = transit_matrix[j, k]
-                    train_volume = train_volumes[j, k]
-                    load_rate = load_point.capacity / time_horizon
-                    load_process = train_volume / load_rate
-                    unload_rate = unload_destination.capacity / time_horizon
-                    unload_process = train_volume / unload_rate
-                    matrix[n, :, j, k] += time + unload_process
-                    matrix[n, k, j, :] += time + load_process
             restriction = Restriction(
-                coefficients=matrix,
+                indices=self.positions(trains=n),
+                values=cycle_times,
                 sense=self.restriction_type.value,
-                resource=time_horizon
+                resource=time_horizon * self.__fleet_size(n),
+                shape=self.cardinality
             )
             restrictions.append(restriction)
         return restrictions
 
-    def __build_transit_matrix(self, transit_times: list[TransitTime]) -> np.ndarray:
-        l = len(self.loaded_origins)
-        u = len(self.loaded_destinations)
-        shape = (l, u)
-        matrix = np.zeros(shape)
-        for transit in transit_times:
-            if transit.origin in self.loaded_origins:
-                j = self.loaded_origins.index(transit.origin)
-                k = self.loaded_destinations.index(transit.destination)
-                matrix[j, k] = transit.time
-        return matrix
+    def __fleet_size(self, n: int) -> int:
+        if self.__train_classes is None:
+            return 1
+        return self.__train_classes[n].size
 
-    def __build_train_volumes(self, flows):
-        l = len(self.loaded_origins)
-        u = len(self.loaded_destinations)
-        shape = (l, u)
-        matrix = np.zeros(shape)
-        for flow in flows:
-            i = self.loaded_origins.index(flow.origin)
-            j = self.loaded_destinations.index(flow.destination)
-            matrix[i, j] = flow.train_volume
-        return matrix
+    @property
+    def cycle_times(self) -> np.ndarray:
+        """
+        Time spent by one trip (i, j, k) of any train, shape (U, L, U)
+        :return:
+        """
+        return self.cycle_table.cycle_times
 
     def restrictions(self) -> list[Restriction]:
         return self.__restrictions
@@ -0,0 +1,205 @@
+"""
+This file implements RelaxAndRound: turns the solution of the continuous relaxation of the Railroad
+Optimization Problem - ROP - into an integer plan.
+
+The fractional trips are rounded down and the rows still violated are repaired one unit step at a time:
+a "<" row drops a trip that loads it (or adds one that unloads it), a ">" row adds a trip that loads it,
+always taking the step that loses the least objective without breaking a row that is satisfied, or else
+the step that most reduces the total violation. The rounded plan is then topped up, highest cost first,
+with the largest step every row leaves room for. Every step works on the sparse model matrix, so all
+restriction families are respected without knowing them.
+"""
+import numpy as np
+from optimizer.model_matrix import ModelMatrix
+
+
+class RelaxAndRound:
+    def __init__(self, model: ModelMatrix, tolerance: float = 1e-6, max_steps: int = None):
+        """
+        :param model: model whose relaxation was solved
+        :param tolerance: absolute slack accepted on every row
+        :param max_steps: limit of unit repair steps (10 times the number of variables when None)
+        """
+        self.model = model
+        self.tolerance = tolerance
+        self.max_steps = max_steps if max_steps is not None else 10 * max(model.variables, 1)
+        self.__columns = model.coefficients.tocsc()
+        self.__less = model.senses == "<"
+        self.__greater = model.senses == ">"
+        self.__equal = model.senses == "="
+        rows = model.coefficients
+        # size of one unit step on each row, to compare violations of rows in different units
+        self.__scales = np.ones(model.constraints)
+        filled = np.diff(rows.indptr) > 0
+        if filled.any():
+            self.__scales[filled] = np.maximum.reduceat(np.abs(rows.data), rows.indptr[:-1][filled])
+
+    def violations(self, values: np.ndarray) -> np.ndarray:
+        """
+        Amount by which each row is violated, zero for satisfied rows
+        :return:
+        """
+        return self.__violations(self.model.coefficients @ values)
+
+    def is_feasible(self, values: np.ndarray) -> bool:
+        return bool(np.all(self.violations(values) <= self.tolerance))
+
+    def round(self, values: np.ndarray) -> np.ndarray:
+        """
+        Rounds a relaxed solution to an integer one, repaired and topped up as described in the module
+        :param values: relaxed value of each model column
+        :return: integer values, feasible unless the repair got stuck (check with `is_feasible`)
+        """
+        relaxed = np.maximum(np.asarray(values, dtype=float), 0)
+        rounded = np.floor(relaxed + self.tolerance)
+        activity = self.model.coefficients @ rounded
+        activity = self.__repair(rounded, activity)
+        self.__fill(rounded, activity, relaxed - rounded)
+        return rounded
+
+    def __violations(self, activity: np.ndarray, rows=slice(None)) -> np.ndarray:
+        """
+        Violation of `rows` given their activity (coefficients * values)
+        """
+        resources = self.model.resources[rows]
+        excess = np.maximum(activity - resources, 0)
+        shortage = np.maximum(resources - activity, 0)
+        return np.where(self.__less[rows], excess, 0) + np.where(self.__greater[rows], shortage, 0) + \
+            np.where(self.__equal[rows], excess + shortage, 0)
+
+    def __column(self, column: int) -> tuple[np.ndarray, np.ndarray]:
+        start, end = self.__columns.indptr[column], self.__columns.indptr[column + 1]
+        return self.__columns.indices[start:end], self.__columns.data[start:end]
+
+    def __keeps_feasibility(self, column: int, step: float, activity: np.ndarray) -> bool:
+        """
+        Whether moving `column` by `step` leaves every row no more violated than it is now
+        """
+        rows, data = self.__column(column)
+        before = self.__violations(activity[rows], rows)
+        after = self.__violations(activity[rows] + step * data, rows)
+        return bool(np.all((after <= self.tolerance) | (after <= before)))
+
+    def __least_violating(
+            self,
+            candidates: np.ndarray,
+            steps: np.ndarray,
+            activity: np.ndarray,
+            moves: np.ndarray
+    ):
+        """
+        Position, in candidates, of the step that most reduces the total violation, each row counted in unit
+        steps, the first one on ties; None when every step increases it. Used when every step breaks some row,
+        e.g. dropping a trip that arrives at a node whose departures are bounded by its arrivals, so the next
+        steps can fix the rows it breaks. A column is never moved back against an earlier move, so the steps
+        can not undo each other.
+        :param candidates: columns, in the order of preference
+        :param moves: direction of the earlier moves of each column, 0 if never moved
+        """
+        changes = np.full(len(candidates), np.inf)
+        for position, (column, step) in enumerate(zip(candidates, steps)):
+            if moves[column] * step < 0:
+                continue
+            rows, data = self.__column(column)
+            before = self.__violations(activity[rows], rows)
+            after = self.__violations(activity[rows] + step * data, rows)
+            changes[position] = np.sum((after - before) / self.__scales[rows])
+        best = int(np.argmin(changes))
+        return best if changes[best] <= self.tolerance else None
+
+    def __repair(self, values: np.ndarray, activity: np.ndarray) -> np.ndarray:
+        rows = self.model.coefficients
+        costs = self.model.costs
+        moves = np.zeros(self.model.variables)
+        for _ in range(self.max_steps):
+            violations = self.__violations(activity)
+            row = int(np.argmax(violations))
+            if violations[row] <= self.tolerance:
+                break
+            columns = rows.indices[rows.indptr[row]:rows.indptr[row + 1]]
+            data = rows.data[rows.indptr[row]:rows.indptr[row + 1]]
+            # direction that reduces the violation of the row
+            direction = 1.0 if activity[row] < self.model.resources[row] else -1.0
+            steps = direction * np.sign(data)
+            movable = (steps > 0) | (values[columns] >= 1)
+            candidates, steps = columns[movable], steps[movable]
+            if len(candidates) == 0:
+                break
+            # least objective loss first
+            order = np.argsort(-costs[candidates] * steps, kind="stable")
+            chosen = None
+            for position in order:
+                if self.__keeps_feasibility(candidates[position], steps[position], activity):
+                    chosen = position
+                    break
+            if chosen is None:
+                chosen = self.__least_violating(candidates[order], steps[order], activity, moves)
+                chosen = order[chosen] if chosen is not None else None
+            if chosen is None:
+                break
+            column, step = candidates[chosen], steps[chosen]
+            values[column] += step
+            moves[column] = step
+            column_rows, column_data = self.__column(column)
+            activity[column_rows] += step * column_data
+        return activity
+
+    def __fill(self, values: np.ndarray, activity: np.ndarray, fractions: np.ndarray):
+        """
+        Tops up the columns with positive cost, highest cost first and, among equal costs, largest fractional
+        part first. Each column takes at once the largest step its rows have room for, the minimum over its
+        rows of slack / coefficient; the steps of every column are computed in one pass and only recomputed,
+        on the rows of a column, once an earlier column took some of their slack. Passes are repeated while
+        a step frees room for others (e.g. the arrivals of the empty offer rows).
+        """
+        costs = self.model.costs
+        columns = self.__columns
+        starts = columns.indptr[:-1]
+        filled = np.diff(columns.indptr) > 0
+        # entries moving their row towards its resource, and their size
+        consumes = (self.__less[columns.indices] & (columns.data > 0)) | \
+            (self.__greater[columns.indices] & (columns.data < 0)) | self.__equal[columns.indices]
+        magnitudes = np.abs(columns.data)
+        while True:
+            slack = self.__slack(activity)
+            limits = self.__limits(slack[columns.indices], consumes, magnitudes)
+            steps = np.full(columns.shape[1], np.inf)
+            steps[filled] = np.minimum.reduceat(limits, starts[filled])
+            candidates = np.flatnonzero((costs > 0) & (steps >= 1))
+            if len(candidates) == 0:
+                break
+            order = candidates[np.lexsort((-fractions[candidates], -costs[candidates]))]
+            touched = np.zeros(self.model.constraints, dtype=bool)
+            added = False
+            for column in order:
+                start, end = columns.indptr[column], columns.indptr[column + 1]
+                rows = columns.indices[start:end]
+                step = steps[column]
+                if touched[rows].any():
+                    step = self.__limits(slack[rows], consumes[start:end], magnitudes[start:end]).min(initial=np.inf)
+                if step < 1:
+                    continue
+                # a column that no row limits takes a single step, the objective is unbounded along it
+                step = 1.0 if np.isinf(step) else step
+                values[column] += step
+                activity[rows] += step * columns.data[start:end]
+                slack[rows] = self.__slack(activity, rows)
+                touched[rows] = True
+                added = True
+            if not added:
+                break
+
+    def __slack(self, activity: np.ndarray, rows=slice(None)) -> np.ndarray:
+        """
+        Room left on `rows` before their resource, negative for violated rows ("=" rows have no room)
+        """
+        difference = self.model.resources[rows] - activity[rows]
+        return np.where(self.__less[rows], difference, np.where(self.__greater[rows], -difference, -np.abs(difference)))
+
+    def __limits(self, slack: np.ndarray, consumes: np.ndarray, magnitudes: np.ndarray) -> np.ndarray:
+        """
+        Largest whole step allowed by the rows of some entries: their slack over the coefficient for the entries
+        that consume it, unlimited for the others, and none on the rows already violated
+        """
+        limits = np.where(consumes, np.floor((slack + self.tolerance) / magnitudes), np.inf)
+        return np.where(slack < -self.tolerance, 0, limits)
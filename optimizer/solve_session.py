@@ -0,0 +1,41 @@
+"""
+This file implements SolveSession: a solver model of a RailroadOptimizationProblem kept alive between
+re-solves.
+
+Planners change the instance data in place - Demand.minimum / Demand.maximum, Node.capacity,
+ExchangeBand.band - and call `solve` again. The session rebuilds the restriction families, updates the
+built solver model with the new resources and coefficients and re-optimises using the previous solution
+as a warm start.
+"""
+from typing import Optional
+from optimizer.optimization_model import RailroadOptimizationProblem, RailroadResult
+from optimizer.solvers.solver_backend import SolverBackend, SolverHandle, SolverOutcome, ProgressCallback
+from optimizer.solvers.gurobi_backend import GurobiBackend
+
+
+class SolveSession:
+    def __init__(self, problem: RailroadOptimizationProblem, backend: SolverBackend = None):
+        self.problem = problem
+        self.backend = backend or GurobiBackend()
+        self.__handle: Optional[SolverHandle] = None
+        self.outcome: Optional[SolverOutcome] = None
+
+    def solve(self, max_time: float, progress: ProgressCallback = None) -> Optional[RailroadResult]:
+        """
+        Solves the problem with its current data
+        :param max_time: solver time limit in seconds
+        :param progress: see SolverBackend.run
+        :return: RailroadResult, or None when the solver found no solution
+        """
+        if self.__handle is None:
+            self.__handle = self.backend.build(self.problem.model_matrix)
+        else:
+            self.problem.build_restrictions()
+            self.__handle = self.backend.update(self.__handle, self.problem.model_matrix)
+
+        start = None
+        if self.outcome is not None and self.outcome.has_solution:
+            start = self.outcome.values
+        self.outcome = self.backend.run(self.__handle, max_time=max_time, start=start, progress=progress)
+        if self.outcome.has_solution:
+            return self.problem.build_result(values=self.outcome.values)
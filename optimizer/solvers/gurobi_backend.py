@@ -0,0 +1,181 @@
+import time
+import numpy as np
+from dataclasses import dataclass
+from optimizer.model_matrix import ModelMatrix
+from optimizer.solvers.solver_backend import SolverBackend, SolverOutcome, SolverStatus, SolverHandle, \
+    SolverProgress, ProgressCallback
+
+try:
+    import gurobipy as gp
+except ImportError:     # pragma: no cover - gurobi is optional
+    gp = None
+
+
+@dataclass
+class GurobiModel:
+    model: "gp.Model"
+    variables: "gp.MVar"
+    constraints: "gp.MConstr"
+
+
+class GurobiBackend(SolverBackend):
+    """
+    Gurobi backend. Built models are modified in place by `update`: resources and objective coefficients
+    are overwritten and changed constraint coefficients are patched with chgCoeff, so Gurobi can reuse the
+    previous basis. Models whose rows or sparsity pattern changed are rebuilt.
+    """
+    name = "gurobi"
+    multithreaded = True
+
+    def __init__(self, verbose: bool = True, threads: int = None, progress_interval: float = 1.0):
+        """
+        :param threads: Gurobi Threads parameter, None lets Gurobi use every core
+        :param progress_interval: seconds between two progress notifications while the incumbent and bound
+            do not change, so a stop request is still read on a branch and bound plateau
+        """
+        if gp is None:
+            raise ImportError("gurobipy is required to use GurobiBackend")
+        self.verbose = verbose
+        self.threads = threads
+        self.progress_interval = progress_interval
+
+    def build(self, model: ModelMatrix) -> SolverHandle:
+        start = time.perf_counter()
+        gurobi_model = gp.Model("Railroad Optimization Problem")
+        gurobi_model.Params.OutputFlag = int(self.verbose)
+        if self.threads is not None:
+            gurobi_model.Params.Threads = self.threads
+        x = gurobi_model.addMVar(model.variables, vtype=gp.GRB.INTEGER)
+        gurobi_model.setObjective(model.costs @ x, sense=gp.GRB.MAXIMIZE)
+        constraints = gurobi_model.addMConstr(model.coefficients, x, model.senses, model.resources)
+        gurobi_model.update()
+        return SolverHandle(
+            model=model,
+            native=GurobiModel(model=gurobi_model, variables=x, constraints=constraints),
+            build_time=time.perf_counter() - start
+        )
+
+    def update(self, handle: SolverHandle, model: ModelMatrix) -> SolverHandle:
+        previous = handle.model
+        same_structure = (
+            previous.coefficients.shape == model.coefficients.shape and
+            np.array_equal(previous.senses, model.senses) and
+            np.array_equal(previous.coefficients.indptr, model.coefficients.indptr) and
+            np.array_equal(previous.coefficients.indices, model.coefficients.indices)
+        )
+        if not same_structure:
+            return self.build(model)
+
+        start = time.perf_counter()
+        native = handle.native
+        if not np.array_equal(previous.resources, model.resources):
+            native.constraints.setAttr("RHS", model.resources)
+        if not np.array_equal(previous.costs, model.costs):
+            native.variables.setAttr("Obj", model.costs)
+        changed = np.flatnonzero(previous.coefficients.data != model.coefficients.data)
+        if len(changed):
+            rows = np.repeat(np.arange(model.constraints), np.diff(model.coefficients.indptr))[changed]
+            columns = model.coefficients.indices[changed]
+            constraints = native.constraints.tolist()
+            variables = native.variables.tolist()
+            for row, column, value in zip(rows, columns, model.coefficients.data[changed]):
+                native.model.chgCoeff(constraints[row], variables[column], value)
+        native.model.update()
+        return SolverHandle(model=model, native=native, build_time=time.perf_counter() - start)
+
+    def run(
+            self,
+            handle: SolverHandle,
+            max_time: float,
+            start: np.ndarray = None,
+            progress: ProgressCallback = None
+    ) -> SolverOutcome:
+        native = handle.native
+        native.model.Params.TimeLimit = max_time
+        if start is not None:
+            native.variables.setAttr("Start", start)
+
+        begin = time.perf_counter()
+        if progress is None:
+            native.model.optimize()
+        else:
+            native.model.optimize(self.__callback(progress, interval=self.progress_interval))
+        solve_time = time.perf_counter() - begin
+
+        has_solution = native.model.SolCount > 0
+        return SolverOutcome(
+            status=self.__status(native.model.status),
+            values=native.variables.X if has_solution else None,
+            objective=native.model.ObjVal if has_solution else None,
+            build_time=handle.build_time,
+            solve_time=solve_time,
+            bound=native.model.ObjBound if has_solution else None
+        )
+
+    def relax(self, handle: SolverHandle, max_time: float) -> SolverOutcome:
+        relaxed = handle.native.model.relax()
+        relaxed.Params.TimeLimit = max_time
+
+        begin = time.perf_counter()
+        relaxed.optimize()
+        solve_time = time.perf_counter() - begin
+
+        has_solution = relaxed.status == gp.GRB.OPTIMAL
+        objective = relaxed.ObjVal if has_solution else None
+        return SolverOutcome(
+            status=self.__status(relaxed.status),
+            values=np.array(relaxed.getAttr("X", relaxed.getVars())) if has_solution else None,
+            objective=objective,
+            build_time=handle.build_time,
+            solve_time=solve_time,
+            bound=objective,
+            duals=np.array(relaxed.getAttr("Pi", relaxed.getConstrs())) if has_solution else None
+        )
+
+    @staticmethod
+    def __callback(progress: ProgressCallback, interval: float):
+        """
+        Gurobi callback reporting each new incumbent and bound, and the unchanged ones every `interval`
+        seconds; the solve is terminated when `progress` returns True
+        """
+        where_codes = gp.GRB.Callback
+        last = [None, -np.inf]      # (incumbent, bound) and runtime of the last notification
+
+        def callback(model, where):
+            if where == where_codes.MIP:
+                incumbent = model.cbGet(where_codes.MIP_OBJBST)
+                bound = model.cbGet(where_codes.MIP_OBJBND)
+                nodes = model.cbGet(where_codes.MIP_NODCNT)
+            elif where == where_codes.MIPSOL:
+                # the best objective does not count the new solution yet (the model is a maximization)
+                incumbent = max(model.cbGet(where_codes.MIPSOL_OBJ), model.cbGet(where_codes.MIPSOL_OBJBST))
+                bound = model.cbGet(where_codes.MIPSOL_OBJBND)
+                nodes = model.cbGet(where_codes.MIPSOL_NODCNT)
+            else:
+                return
+            elapsed = model.cbGet(where_codes.RUNTIME)
+            if last[0] == (incumbent, bound) and elapsed - last[1] < interval:
+                return
+            last[0], last[1] = (incumbent, bound), elapsed
+            snapshot = SolverProgress(
+                incumbent=incumbent if abs(incumbent) < gp.GRB.INFINITY else None,
+                bound=bound if abs(bound) < gp.GRB.INFINITY else None,
+                nodes=nodes,
+                elapsed=elapsed
+            )
+            if progress(snapshot):
+                model.terminate()
+
+        return callback
+
+    @staticmethod
+    def __status(status: int) -> SolverStatus:
+        statuses = {
+            gp.GRB.OPTIMAL: SolverStatus.OPTIMAL,
+            gp.GRB.TIME_LIMIT: SolverStatus.TIME_LIMIT,
+            gp.GRB.INFEASIBLE: SolverStatus.INFEASIBLE,
+            gp.GRB.INF_OR_UNBD: SolverStatus.INFEASIBLE,
+            gp.GRB.UNBOUNDED: SolverStatus.UNBOUNDED,
+            gp.GRB.INTERRUPTED: SolverStatus.INTERRUPTED,
+        }
+        return statuses.get(status, SolverStatus.ERROR)
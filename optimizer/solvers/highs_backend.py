@@ -0,0 +1,139 @@
+import time
+import numpy as np
+from scipy import sparse
+from scipy.optimize import milp, linprog, LinearConstraint, Bounds
+from optimizer.model_matrix import ModelMatrix
+from optimizer.restrictions.restrictions import RestrictionType
+from optimizer.solvers.solver_backend import SolverBackend, SolverOutcome, SolverStatus, SolverHandle, \
+    SolverProgress, ProgressCallback
+
+
+class HighsBackend(SolverBackend):
+    """
+    Open source backend: solves the model with HiGHS through scipy.optimize.milp, and its relaxation
+    through scipy.optimize.linprog, which also reports the duals.
+    scipy does not expose warm starts nor callbacks, so `start` is ignored and `progress` only receives the
+    final state of the solve.
+    """
+    name = "highs"
+
+    def __init__(self, verbose: bool = True, threads: int = None):
+        """
+        :param threads: kept for interface parity; the HiGHS MIP solver behind scipy runs on one thread (see
+            SolverBackend.multithreaded)
+        """
+        self.verbose = verbose
+        self.threads = threads
+
+    def build(self, model: ModelMatrix) -> SolverHandle:
+        start = time.perf_counter()
+        lower, upper = self.bounds(model)
+        constraints = LinearConstraint(model.coefficients, lower, upper)
+        return SolverHandle(model=model, native=constraints, build_time=time.perf_counter() - start)
+
+    def run(
+            self,
+            handle: SolverHandle,
+            max_time: float,
+            start: np.ndarray = None,
+            progress: ProgressCallback = None
+    ) -> SolverOutcome:
+        outcome, nodes = self.__milp(handle=handle, max_time=max_time)
+        if progress is not None:
+            progress(SolverProgress(
+                incumbent=outcome.objective,
+                bound=outcome.bound,
+                nodes=nodes,
+                elapsed=outcome.solve_time
+            ))
+        return outcome
+
+    def relax(self, handle: SolverHandle, max_time: float) -> SolverOutcome:
+        model = handle.model
+        less = model.senses == RestrictionType.LESS_OR_EQUAL.value
+        greater = model.senses == RestrictionType.GREATER_OR_EQUAL.value
+        equal = model.senses == RestrictionType.EQUALITY.value
+        rows = sparse.csr_matrix(model.coefficients)
+        begin = time.perf_counter()
+        result = linprog(
+            c=-model.costs,     # linprog minimizes
+            A_ub=sparse.vstack([rows[less], -rows[greater]]) if (less | greater).any() else None,
+            b_ub=np.concatenate([model.resources[less], -model.resources[greater]]) if (less | greater).any() else None,
+            A_eq=rows[equal] if equal.any() else None,
+            b_eq=model.resources[equal] if equal.any() else None,
+            bounds=(0, None),
+            method="highs",
+            options={"time_limit": max_time, "disp": self.verbose}
+        )
+        solve_time = time.perf_counter() - begin
+
+        has_solution = result.x is not None
+        duals = None
+        if has_solution:
+            # marginals are derivatives of the minimized objective, duals of the maximized one
+            duals = np.zeros(model.constraints)
+            if (less | greater).any():
+                marginals = result.ineqlin.marginals
+                duals[less] = -marginals[:less.sum()]
+                duals[greater] = marginals[less.sum():]
+            if equal.any():
+                duals[equal] = -result.eqlin.marginals
+        objective = -result.fun if has_solution else None
+        return SolverOutcome(
+            status=self.__status(result.status),
+            values=result.x if has_solution else None,
+            objective=objective,
+            build_time=handle.build_time,
+            solve_time=solve_time,
+            bound=objective,
+            duals=duals
+        )
+
+    def __milp(self, handle: SolverHandle, max_time: float) -> tuple[SolverOutcome, int]:
+        model = handle.model
+        begin = time.perf_counter()
+        result = milp(
+            c=-model.costs,     # milp minimizes
+            constraints=handle.native,
+            integrality=np.ones(model.variables),
+            bounds=Bounds(0, np.inf),
+            options={"time_limit": max_time, "disp": self.verbose}
+        )
+        solve_time = time.perf_counter() - begin
+
+        has_solution = result.x is not None
+        bound = getattr(result, "mip_dual_bound", None)
+        outcome = SolverOutcome(
+            status=self.__status(result.status),
+            values=np.round(result.x) if has_solution else None,
+            objective=-result.fun if has_solution else None,
+            build_time=handle.build_time,
+            solve_time=solve_time,
+            bound=-bound if bound is not None else None
+        )
+        return outcome, getattr(result, "mip_node_count", 0) or 0
+
+    @staticmethod
+    def bounds(model: ModelMatrix) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Converts senses and resources to the lower <= A x <= upper form
+        :return:
+        """
+        lower = np.full(model.constraints, -np.inf)
+        upper = np.full(model.constraints, np.inf)
+        less = model.senses == RestrictionType.LESS_OR_EQUAL.value
+        greater = model.senses == RestrictionType.GREATER_OR_EQUAL.value
+        equal = model.senses == RestrictionType.EQUALITY.value
+        upper[less | equal] = model.resources[less | equal]
+        lower[greater | equal] = model.resources[greater | equal]
+        return lower, upper
+
+    @staticmethod
+    def __status(status: int) -> SolverStatus:
+        statuses = {
+            0: SolverStatus.OPTIMAL,
+            1: SolverStatus.TIME_LIMIT,
+            2: SolverStatus.INFEASIBLE,
+            3: SolverStatus.UNBOUNDED,
+        }
+        return statuses.get(status, SolverStatus.ERROR)
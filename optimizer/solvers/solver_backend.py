@@ -0,0 +1,148 @@
+"""
+This file declares the solver interface - class SolverBackend - used by the Railroad Optimization Problem
+to solve its assembled ModelMatrix
+
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Any, Callable
+import numpy as np
+from optimizer.model_matrix import ModelMatrix
+
+
+class SolverStatus(Enum):
+    OPTIMAL = "optimal"
+    TIME_LIMIT = "time limit"
+    FEASIBLE = "feasible"
+    INTERRUPTED = "interrupted"
+    INFEASIBLE = "infeasible"
+    NO_SOLUTION = "no solution"
+    """A heuristic found no solution, which does not prove the model infeasible"""
+    UNBOUNDED = "unbounded"
+    ERROR = "error"
+
+
+def relative_gap(objective: Optional[float], bound: Optional[float]) -> Optional[float]:
+    """
+    Relative distance between an objective and its best bound
+    :return: None when either is unknown
+    """
+    if objective is None or bound is None:
+        return None
+    if bound == 0:
+        return 0.0 if objective == 0 else float("inf")
+    return abs(bound - objective) / abs(bound)
+
+
+@dataclass
+class SolverProgress:
+    """
+    Snapshot of a running solve
+    """
+    incumbent: Optional[float]
+    bound: Optional[float]
+    nodes: float
+    elapsed: float
+
+    @property
+    def gap(self) -> Optional[float]:
+        return relative_gap(self.incumbent, self.bound)
+
+
+ProgressCallback = Callable[[SolverProgress], Optional[bool]]
+"""Receives the progress of a solve; returning True stops it early, keeping the best incumbent"""
+
+
+@dataclass
+class SolverOutcome:
+    status: SolverStatus
+    values: Optional[np.ndarray]
+    objective: Optional[float]
+    build_time: float
+    solve_time: float
+    bound: Optional[float] = None
+    duals: Optional[np.ndarray] = None
+
+    @property
+    def has_solution(self) -> bool:
+        return self.values is not None
+
+    @property
+    def gap(self) -> Optional[float]:
+        """
+        Relative distance between the objective and the best bound
+        :return:
+        """
+        return relative_gap(self.objective, self.bound)
+
+
+@dataclass
+class SolverHandle:
+    """
+    A model built by a backend, kept alive between solves
+    """
+    model: ModelMatrix
+    native: Any
+    build_time: float
+
+
+class SolverBackend(ABC):
+    name: str = ""
+    multithreaded: bool = False
+    """True when the `threads` attribute limits the solver threads, otherwise a solve uses one thread"""
+
+    @abstractmethod
+    def build(self, model: ModelMatrix) -> SolverHandle:
+        """
+        Builds the solver representation of `model`
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def run(
+            self,
+            handle: SolverHandle,
+            max_time: float,
+            start: np.ndarray = None,
+            progress: ProgressCallback = None
+    ) -> SolverOutcome:
+        """
+        Solves a built model as a maximization MIP with non negative integer variables
+        :param handle: model built by this backend
+        :param max_time: time limit in seconds
+        :param start: optional solution, one value per column, used as warm start when supported
+        :param progress: called, from the solving thread, with the progress of the solve. Backends without
+            solver callbacks only report the final state.
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def relax(self, handle: SolverHandle, max_time: float) -> SolverOutcome:
+        """
+        Solves the continuous relaxation of a built model
+        :param handle: model built by this backend
+        :param max_time: time limit in seconds
+        :return: outcome with fractional values and the duals of the rows; its objective is an upper bound
+            of the MIP
+        """
+        pass
+
+    def update(self, handle: SolverHandle, model: ModelMatrix) -> SolverHandle:
+        """
+        Brings a built model up to date with `model`. Backends that can modify a model in place override
+        this method, the default rebuilds it.
+        :return:
+        """
+        return self.build(model)
+
+    def solve(self, model: ModelMatrix, max_time: float) -> SolverOutcome:
+        """
+        Builds and solves `model`
+        :param model: assembled problem
+        :param max_time: time limit in seconds
+        :return:
+        """
+        return self.run(self.build(model), max_time=max_time)
@@ -0,0 +1,81 @@
+"""
+This file declares the SparsePlan: the trips of a Railroad Optimization Problem - ROP - solution kept as its
+nonzero entries only, (flat position in the variable tensor, value) pairs, instead of the dense
+(trains, U, L, U) tensor, whose values are nearly all zero for large fleets.
+
+Reductions over the tensor axes are computed from the entries with np.bincount; the dense tensor is only
+built by `to_dense`.
+"""
+import numpy as np
+from optimizer.variable_index import VariableIndex
+
+
+class SparsePlan:
+    def __init__(self, shape: tuple, positions: np.ndarray, values: np.ndarray):
+        """
+        :param shape: variable tensor shape, (trains, U, L, U)
+        :param positions: sorted flat positions, in the variable tensor, of the nonzero entries
+        :param values: value of each entry
+        """
+        self.__shape = tuple(int(s) for s in shape)
+        self.__positions = np.asarray(positions, dtype=np.int64)
+        self.__values = np.asarray(values, dtype=float)
+        self.__positions.setflags(write=False)
+        self.__values.setflags(write=False)
+
+    @classmethod
+    def from_dense(cls, tensor: np.ndarray) -> "SparsePlan":
+        tensor = np.asarray(tensor)
+        positions = np.flatnonzero(tensor)
+        return cls(shape=tensor.shape, positions=positions, values=tensor.ravel()[positions])
+
+    @classmethod
+    def from_columns(cls, index: VariableIndex, values: np.ndarray) -> "SparsePlan":
+        """
+        :param values: one value per model column, as read from the solver
+        """
+        values = np.asarray(values, dtype=float)
+        columns = np.flatnonzero(values)
+        return cls(shape=index.shape, positions=index.positions[columns], values=values[columns])
+
+    @property
+    def shape(self) -> tuple:
+        return self.__shape
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self.__positions
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.__values
+
+    def __len__(self):
+        return len(self.__positions)
+
+    def labels(self) -> np.ndarray:
+        """
+        Labels (n, i, j, k) of the entries
+        :return: integer array with one label per row
+        """
+        return np.stack(np.unravel_index(self.__positions, self.__shape), axis=-1)
+
+    def to_dense(self) -> np.ndarray:
+        tensor = np.zeros(int(np.prod(self.__shape)))
+        tensor[self.__positions] = self.__values
+        return tensor.reshape(self.__shape)
+
+    def reduce(self, keep: tuple, weights: np.ndarray = None) -> np.ndarray:
+        """
+        Sum of the tensor over every axis but `keep`
+        :param keep: axes kept, in order
+        :param weights: factor of each (n, i, j, k), broadcast to the tensor shape, e.g. the trip times
+        :return: array of shape (shape[a] for a in keep)
+        """
+        labels = np.unravel_index(self.__positions, self.__shape)
+        values = self.__values
+        if weights is not None:
+            values = values * np.broadcast_to(weights, self.__shape)[labels]
+        kept_shape = tuple(self.__shape[axis] for axis in keep)
+        flat = np.ravel_multi_index(tuple(labels[axis] for axis in keep), kept_shape)
+        return np.bincount(flat, weights=values, minlength=int(np.prod(kept_shape))).reshape(kept_shape)
@@ -0,0 +1,154 @@
+"""
+This file groups interchangeable trains in equivalence classes for the aggregated formulation of the
+Railroad Optimization Problem - ROP.
+
+Trains only differ by their initial position (Node.initial_trains), so in the aggregated formulation the
+trains axis of the variable tensor indexes classes and each variable counts the trips of the whole class.
+`disaggregate` splits the trips of each class back to its trains. The time horizon is enforced for the
+class as a whole, so after the split a train may exceed it; `rebalance` then moves trips to the trains with
+time left. The split is infeasible for the per-train model only when no such move exists (see
+RailroadResult.needs_repair).
+"""
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from optimizer.restrictions.railroad_elements import Node
+
+
+@dataclass
+class TrainClass:
+    start: Optional[Node]
+    trains: list[int]
+
+    @property
+    def size(self) -> int:
+        return len(self.trains)
+
+
+def build_train_classes(trains: int, empty_origins: list[Node]) -> list[TrainClass]:
+    """
+    Trains are numbered as in DispatchInitialTrain: the initial trains of each empty origin, in order,
+    followed by the trains without initial position
+    :param trains: fleet size
+    :param empty_origins: unload points, in the problem order
+    :return:
+    """
+    classes = []
+    next_train = 0
+    for node in empty_origins:
+        size = min(node.initial_trains, trains - next_train)
+        if size > 0:
+            classes.append(TrainClass(start=node, trains=list(range(next_train, next_train + size))))
+            next_train += size
+    if next_train < trains:
+        classes.append(TrainClass(start=None, trains=list(range(next_train, trains))))
+    return classes
+
+
+def disaggregate(
+        solution: np.ndarray,
+        classes: list[TrainClass],
+        empty_origins: list[Node],
+        cycle_times: np.ndarray,
+        time_horizon: float = None
+) -> np.ndarray:
+    """
+    Splits the trips of each class among its trains. Each train first receives one departure from its
+    initial position, the remaining trips are assigned, longest cycle first, to the least used train.
+    :param solution: trips by class, shape (classes, U, L, U)
+    :param classes: train classes, in the solution order
+    :param empty_origins: unload points, in the problem order
+    :param cycle_times: time of one trip (i, j, k), shape (U, L, U)
+    :param time_horizon: when given, the split is rebalanced so no train exceeds it, where possible
+    :return: trips by train, shape (trains, U, L, U)
+    """
+    trains = sum(c.size for c in classes)
+    result = np.zeros((trains,) + solution.shape[1:])
+    starts = np.full(trains, -1)
+    for c, train_class in enumerate(classes):
+        trips = np.rint(solution[c]).astype(int)
+        used_time = np.zeros(train_class.size)
+        if train_class.start is not None:
+            i = empty_origins.index(train_class.start)
+            starts[train_class.trains] = i
+            for t in range(train_class.size):
+                departures = np.argwhere(trips[i] > 0)
+                if not len(departures):
+                    break
+                j, k = departures[0]
+                trips[i, j, k] -= 1
+                result[train_class.trains[t], i, j, k] += 1
+                used_time[t] += cycle_times[i, j, k]
+        labels = np.argwhere(trips > 0)
+        labels = labels[np.argsort(-cycle_times[tuple(labels.T)], kind="stable")]
+        for label in labels:
+            for _ in range(trips[tuple(label)]):
+                t = int(np.argmin(used_time))
+                result[(train_class.trains[t],) + tuple(label)] += 1
+                used_time[t] += cycle_times[tuple(label)]
+    if time_horizon is not None:
+        rebalance(plan=result, starts=starts, cycle_times=cycle_times, time_horizon=time_horizon)
+    return result
+
+
+def rebalance(
+        plan: np.ndarray,
+        starts: np.ndarray,
+        cycle_times: np.ndarray,
+        time_horizon: float,
+        tolerance: float = 1e-9
+) -> np.ndarray:
+    """
+    Moves trips, in place, from the trains above the time horizon to the trains with time left for them:
+    the longest trip that fits goes to the train with most time left, and when none fits, a trip is swapped
+    with a shorter one of a train that stays within the horizon. Trains of any class are interchangeable
+    here: besides the time horizon, only the departure from the initial position is a per-train restriction,
+    and each train keeps one.
+    :param plan: trips by train, shape (trains, U, L, U)
+    :param starts: position, in the empty origins, of the initial position of each train, -1 for none
+    :param cycle_times: time of one trip (i, j, k), shape (U, L, U)
+    :param time_horizon: time available to each train
+    :return: the trains still above the time horizon
+    """
+    used_time = np.tensordot(plan, cycle_times, axes=3)
+
+    def movable(t: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Trips of train t that may leave it and their cycle times
+        """
+        labels = np.argwhere(plan[t] > 0)
+        if starts[t] >= 0 and plan[t, starts[t]].sum() <= 1:
+            labels = labels[labels[:, 0] != starts[t]]
+        return labels, cycle_times[tuple(labels.T)]
+
+    def move(t: int, label: np.ndarray, target: int):
+        label = tuple(label)
+        plan[(t,) + label] -= 1
+        plan[(target,) + label] += 1
+        used_time[t] -= cycle_times[label]
+        used_time[target] += cycle_times[label]
+
+    for t in np.argsort(-used_time, kind="stable"):
+        while used_time[t] > time_horizon + tolerance:
+            labels, times = movable(t)
+            slack = time_horizon - used_time
+            slack[t] = -np.inf
+            fits = np.flatnonzero(times <= slack.max() + tolerance)
+            if len(fits):
+                move(t, labels[fits[np.argmax(times[fits])]], int(np.argmax(slack)))
+                continue
+            best = None     # (time saved by t, trip of t, other train, trip of the other train)
+            for other in np.flatnonzero(slack > -np.inf):
+                other_labels, other_times = movable(other)
+                saved = times[:, np.newaxis] - other_times[np.newaxis, :]
+                swappable = (saved > tolerance) & (saved <= slack[other] + tolerance)
+                if swappable.any():
+                    a, b = np.unravel_index(np.argmax(np.where(swappable, saved, -np.inf)), saved.shape)
+                    if best is None or saved[a, b] > best[0]:
+                        best = (saved[a, b], labels[a], other, other_labels[b])
+            if best is None:
+                break
+            _, label, other, other_label = best
+            move(t, label, other)
+            move(other, other_label, t)
+    return np.flatnonzero(used_time > time_horizon + tolerance)
@@ -0,0 +1,72 @@
+"""
+This file declares the VariableIndex: the immutable mapping between the model columns - flat integer ids
+0..len-1 - and the variable labels (n, i, j, k) of the Railroad Optimization Problem - ROP
+
+"""
+import numpy as np
+
+
+class VariableIndex:
+    def __init__(self, shape: tuple, positions: np.ndarray = None):
+        """
+        :param shape: variable tensor shape, (trains, U, L, U)
+        :param positions: sorted flat positions, in the variable tensor, of the model columns (all when None)
+        """
+        self.__shape = tuple(int(s) for s in shape)
+        size = int(np.prod(self.__shape))
+        if positions is None:
+            positions = np.arange(size)
+        positions = np.array(positions, dtype=np.int64)
+        positions.setflags(write=False)
+        self.__positions = positions
+
+    @property
+    def shape(self) -> tuple:
+        return self.__shape
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self.__positions
+
+    def __len__(self):
+        return len(self.__positions)
+
+    def to_labels(self, columns: np.ndarray = None) -> np.ndarray:
+        """
+        Labels (n, i, j, k) of the given columns (all when None)
+        :return: integer array with one label per row
+        """
+        positions = self.__positions if columns is None else self.__positions[columns]
+        return np.stack(np.unravel_index(positions, self.__shape), axis=-1)
+
+    def from_labels(self, labels: np.ndarray) -> np.ndarray:
+        """
+        Columns of the given labels; -1 for labels that are not part of the model
+        :param labels: integer array with one label (n, i, j, k) per row
+        :return:
+        """
+        labels = np.asarray(labels, dtype=np.int64).reshape(-1, len(self.__shape))
+        positions = np.ravel_multi_index(tuple(labels.T), self.__shape)
+        return self.from_positions(positions)
+
+    def from_positions(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Columns of the given flat tensor positions; -1 for positions that are not part of the model
+        :return:
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        columns = np.searchsorted(self.__positions, positions)
+        columns = np.minimum(columns, max(len(self.__positions) - 1, 0))
+        found = len(self.__positions) > 0
+        if found:
+            found = self.__positions[columns] == positions
+        return np.where(found, columns, -1)
+
+    def expand(self, values: np.ndarray) -> np.ndarray:
+        """
+        Places the value of each column in the full variable tensor
+        :return:
+        """
+        tensor = np.zeros(int(np.prod(self.__shape)))
+        tensor[self.__positions] = values
+        return tensor.reshape(self.__shape)
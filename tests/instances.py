@@ -0,0 +1,73 @@
+"""
+Instances shared by the tests. Problems are built with a silent Observer, so the tests print nothing.
+"""
+import numpy as np
+from optimizer.instrumentation import Observer
+from optimizer.optimization_model import RailroadOptimizationProblem
+from optimizer.restrictions.railroad_elements import Node, Flow, Demand, TransitTime, ExchangeBand
+
+
+def build_instance(capacity=500e3, minimum=None, band=4) -> dict:
+    """
+    Two flows out of terminal 1, towards the two terminals holding the initial trains
+    :param capacity: capacity of terminal 1
+    :param minimum: minimum demand of the second flow
+    :param band: exchange band of terminal 2
+    :return: the RailroadOptimizationProblem arguments
+    """
+    n1 = Node(name='terminal 1', capacity=capacity)
+    n2 = Node(name='terminal 2', capacity=500e3, initial_trains=1)
+    n3 = Node(name='terminal 3', capacity=500e3, initial_trains=1)
+    f1 = Flow(origin=n1, destination=n2, train_volume=5e3)
+    f2 = Flow(origin=n1, destination=n3, train_volume=6e3)
+    return dict(
+        trains=2,
+        demands=[Demand(flow=f1, minimum=5e3, maximum=50e3), Demand(flow=f2, minimum=minimum, maximum=40e3)],
+        transit_times=[
+            TransitTime(origin=n1, destination=n2, time=2.5),
+            TransitTime(origin=n1, destination=n3, time=3.9),
+        ],
+        exchange_bands=[ExchangeBand(node=n2, band=band)],
+        time_horizon=30
+    )
+
+
+def build_problem(aggregate_trains=False, observer: Observer = None) -> RailroadOptimizationProblem:
+    """
+    Three trains, two of them with initial position, over three flows
+    :param observer: silent Observer when None
+    """
+    n1 = Node(name='terminal 1', capacity=500e3)
+    n2 = Node(name='terminal 2', capacity=500e3, initial_trains=1)
+    n3 = Node(name='terminal 3', capacity=500e3, initial_trains=1)
+    f1 = Flow(origin=n1, destination=n2, train_volume=5e3)
+    f2 = Flow(origin=n1, destination=n3, train_volume=6e3)
+    f3 = Flow(origin=n2, destination=n3, train_volume=4e3)
+    demands = [
+        Demand(flow=f1, minimum=5e3, maximum=50e3),
+        Demand(flow=f2, minimum=0, maximum=18e3),
+        Demand(flow=f3, minimum=8e3, maximum=40e3),
+    ]
+    transit_times = [
+        TransitTime(origin=n1, destination=n2, time=2.5),
+        TransitTime(origin=n1, destination=n3, time=3.9),
+        TransitTime(origin=n2, destination=n3, time=1.5),
+    ]
+    return RailroadOptimizationProblem(
+        trains=3,
+        transit_times=transit_times,
+        demands=demands,
+        exchange_bands=[ExchangeBand(node=n2, band=4)],
+        time_horizon=30,
+        aggregate_trains=aggregate_trains,
+        observer=observer if observer is not None else Observer()
+    )
+
+
+def violations(problem: RailroadOptimizationProblem, values: np.ndarray) -> np.ndarray:
+    """
+    :return: violation of each model row by `values`, positive when violated
+    """
+    model = problem.model_matrix
+    activity = model.coefficients @ values
+    return np.where(model.senses == "<", activity - model.resources, model.resources - activity)
@@ -0,0 +1,64 @@
+import pytest
+from optimizer.batch import Scenario, run_scenarios, split_threads
+from optimizer.instrumentation import Observer
+from optimizer.optimization_model import RailroadOptimizationProblem
+from optimizer.restrictions.railroad_elements import Node, Flow, Demand, TransitTime
+from optimizer.solvers.highs_backend import HighsBackend
+
+
+def build_problem(maximum: float):
+    n1 = Node(name='terminal 1', capacity=500e3)
+    n2 = Node(name='terminal 2', capacity=500e3, initial_trains=1)
+    flow = Flow(origin=n1, destination=n2, train_volume=5e3)
+    return RailroadOptimizationProblem(
+        trains=1,
+        transit_times=[TransitTime(origin=n1, destination=n2, time=2.5)],
+        demands=[Demand(flow=flow, minimum=0, maximum=maximum)],
+        exchange_bands=[],
+        time_horizon=30,
+        observer=Observer()
+    )
+
+
+def failing_problem():
+    raise ValueError("broken instance")
+
+
+def test_batch_runner_should_stream_one_summary_per_scenario():
+    scenarios = [
+        Scenario(name="small", factory=build_problem, kwargs={"maximum": 10e3}),
+        Scenario(name="large", factory=build_problem, kwargs={"maximum": 20e3}),
+        Scenario(name="broken", factory=failing_problem),
+    ]
+
+    # Act
+    summaries = {s.name: s for s in run_scenarios(scenarios=scenarios, max_time=10, workers=2, total_threads=2)}
+
+    # Assert
+    assert summaries["small"].objective == 10e3
+    assert summaries["large"].objective == 20e3
+    assert summaries["large"].status == "optimal"
+    assert "broken instance" in summaries["broken"].error
+
+
+def test_thread_budget_should_bound_the_workers_of_a_single_threaded_backend():
+    # Act
+    workers, backend = split_threads(backend=HighsBackend(verbose=False), scenarios=10, workers=8, total_threads=3)
+
+    # Assert
+    assert workers == 3
+    assert backend.threads is None
+
+
+def test_thread_budget_should_divide_the_threads_of_a_multithreaded_backend():
+    pytest.importorskip("gurobipy")
+    from optimizer.solvers.gurobi_backend import GurobiBackend
+    gurobi = GurobiBackend(verbose=False)
+
+    # Act
+    workers, backend = split_threads(backend=gurobi, scenarios=10, workers=4, total_threads=8)
+
+    # Assert
+    assert workers == 4
+    assert backend.threads == 2
+    assert gurobi.threads is None
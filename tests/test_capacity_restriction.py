@@ -184,3 +184,29 @@ def test_restriction_vector_for_one_origin_and_two_destinations_and_two_trains()
     expected = np.array(expected)
 
     np.testing.assert_allclose(actual, expected)
+
+
+def test_sparse_coefficients_matrix_should_match_dense_matrix():
+    n1 = Node(name='terminal 1', capacity=500)
+    n2 = Node(name='terminal 2', capacity=600)
+    flows = [
+        Flow(
+            origin=n1,
+            destination=n2,
+            train_volume=50
+        ),
+        Flow(
+            origin=n2,
+            destination=n1,
+            train_volume=60
+        )
+    ]
+    constraint = CapacityRestrictions(trains=2, flows=flows)
+
+    # Act
+    actual = constraint.sparse_coefficients_matrix
+
+    # Assert
+    assert actual.shape == (2, 16)
+    assert actual.nnz == 8
+    np.testing.assert_allclose(actual.toarray(), constraint.coefficients_matrix)
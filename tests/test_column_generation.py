@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from optimization_intances.instances_creator import build_instance
+from optimizer.column_generation import ColumnGeneration
+from optimizer.instrumentation import Observer, Profiler
+from optimizer.optimization_model import RailroadOptimizationProblem, OptimizationMode
+from optimizer.solvers.highs_backend import HighsBackend
+from optimizer.solvers.solver_backend import SolverOutcome, SolverStatus
+from tests.instances import build_problem, violations
+
+
+def random_problem(**kwargs) -> RailroadOptimizationProblem:
+    return RailroadOptimizationProblem(**build_instance(**kwargs), observer=Observer())
+
+
+def test_column_generation_plan_should_satisfy_every_restriction():
+    problem = build_problem()
+    decomposition = ColumnGeneration(problem=problem)
+
+    # Act
+    result = decomposition.solve(max_time=60)
+
+    # Assert
+    plan = result.optimization_result
+    values = plan.reshape(-1)[problem.variable_index.positions]
+    assert values.sum() == plan.sum()
+    assert violations(problem, values).max() <= 1e-6
+    assert np.all(np.sum(plan * result.cycle_times, axis=(1, 2, 3)) <= problem.horizon + 1e-9)
+    outcome = decomposition.outcome
+    assert outcome.objective == problem.model_matrix.costs @ values
+    assert outcome.objective <= outcome.bound + 1e-6
+
+
+def test_column_generation_should_price_patterns_within_the_horizon():
+    problem = build_problem()
+    decomposition = ColumnGeneration(problem=problem)
+    decomposition.solve(max_time=60)
+    cycle_times = problem.time_horizon.cycle_times.reshape(-1)
+
+    # Assert
+    assert decomposition.iterations >= 1
+    for c, trips in decomposition.patterns:
+        assert trips @ cycle_times <= problem.horizon + 1e-9
+        start = decomposition.classes[c].start
+        if start is not None:
+            i = problem.structure.empty_origin_positions[start.identifier]
+            assert trips.reshape(problem.time_horizon.cycle_times.shape)[i].sum() >= 1
+
+
+def test_column_generation_mode_should_be_close_to_the_exact_optimum():
+    problem = build_problem()
+    exact = build_problem()
+
+    # Act
+    problem.optimize(max_time=60, backend=HighsBackend(verbose=False), mode=OptimizationMode.COLUMN_GENERATION)
+    exact.optimize(max_time=60, backend=HighsBackend(verbose=False))
+
+    # Assert
+    assert problem.outcome.has_solution
+    assert problem.outcome.objective <= exact.outcome.objective + 1e-6
+    assert exact.outcome.objective <= problem.outcome.bound + 1e-6
+
+
+@pytest.mark.parametrize("seed", [0, 2, 12])
+def test_column_generation_bound_should_not_fall_below_the_exact_optimum(seed):
+    problem = random_problem(terminals=3, trains=3, seed=seed)
+    exact = random_problem(terminals=3, trains=3, seed=seed)
+
+    # Act
+    problem.optimize(max_time=60, backend=HighsBackend(verbose=False), mode=OptimizationMode.COLUMN_GENERATION)
+    exact.optimize(max_time=60, backend=HighsBackend(verbose=False))
+
+    # Assert
+    assert exact.outcome.status == SolverStatus.OPTIMAL
+    assert problem.outcome.objective <= exact.outcome.objective + 1e-6
+    assert exact.outcome.objective <= problem.outcome.bound + 1e-6
+
+
+def test_column_generation_should_solve_a_master_without_seed_patterns():
+    problem = random_problem(terminals=2, trains=1, initial_trains=False, with_minimum=0, seed=0)
+
+    # Act
+    result = problem.optimize(
+        max_time=60, backend=HighsBackend(verbose=False), mode=OptimizationMode.COLUMN_GENERATION
+    )
+
+    # Assert
+    assert result is not None
+    assert problem.outcome.has_solution
+
+
+def test_column_generation_mode_should_not_build_the_model():
+    profiler = Profiler(trace_memory=False)
+    problem = RailroadOptimizationProblem(**build_instance(terminals=3, trains=3, seed=0), observer=profiler)
+
+    # Act
+    result = problem.optimize(
+        max_time=60, backend=HighsBackend(verbose=False), mode=OptimizationMode.COLUMN_GENERATION
+    )
+
+    # Assert
+    assert result is not None
+    phases = [e.phase for e in profiler.events]
+    assert [p for p in phases if p.startswith("restrictions.") or p == "model.assembly"] == []
+
+
+def test_column_generation_should_fall_back_to_the_greedy_patterns_when_the_master_stops(monkeypatch):
+    problem = build_problem()
+    starts = []
+
+    def stopped_run(self, handle, max_time, start=None, progress=None):
+        starts.append(start)
+        return SolverOutcome(status=SolverStatus.TIME_LIMIT, values=None, objective=None, build_time=0, solve_time=0)
+
+    monkeypatch.setattr(HighsBackend, "run", stopped_run)
+
+    # Act
+    result = problem.optimize(
+        max_time=60, backend=HighsBackend(verbose=False), mode=OptimizationMode.COLUMN_GENERATION
+    )
+
+    # Assert
+    assert starts[-1] is not None
+    assert problem.outcome.status == SolverStatus.TIME_LIMIT
+    assert result is not None
+    values = result.optimization_result.reshape(-1)[problem.variable_index.positions]
+    assert violations(problem, values).max() <= 1e-6
+    assert problem.outcome.objective == problem.model_matrix.costs @ values
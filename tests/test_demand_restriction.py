@@ -112,3 +112,26 @@ def test_minimum_demand_resource_vector_for_one_origin_and_two_destinations_and_
     expected = np.array(expected)
 
     np.testing.assert_allclose(actual, expected)
+
+
+def test_minimum_demand_should_skip_zero_minimum_and_keep_first_demand_of_each_flow():
+    n1 = Node(name='terminal 1', capacity=500)
+    n2 = Node(name='terminal 2', capacity=600)
+    n3 = Node(name='terminal 3', capacity=600)
+    f1 = Flow(origin=n1, destination=n2, train_volume=50)
+    f2 = Flow(origin=n1, destination=n3, train_volume=60)
+
+    demands = [
+        Demand(flow=f2, minimum=20e3, maximum=40e3),
+        Demand(flow=f1, minimum=0, maximum=50e3),
+        Demand(flow=f2, minimum=10e3, maximum=30e3),
+    ]
+
+    constraint = MinimumDemandRestriction(trains=2, demands=demands)
+
+    # Act
+    actual = constraint.resource_vector
+
+    # Assert
+    np.testing.assert_allclose(actual, [20e3])
+    np.testing.assert_allclose(MaximumDemandRestriction(trains=2, demands=demands).resource_vector, [50e3, 40e3])
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from optimizer.heuristics import GreedyPlanner
+from tests.instances import build_problem, violations
+
+
+@pytest.mark.parametrize("aggregate_trains", [False, True])
+def test_greedy_plan_should_satisfy_every_restriction(aggregate_trains):
+    problem = build_problem(aggregate_trains=aggregate_trains)
+
+    # Act
+    values = GreedyPlanner(problem=problem).start_values()
+
+    # Assert
+    assert violations(problem, values).max() <= 1e-9
+    assert problem.model_matrix.costs @ values > 0
+
+
+def test_greedy_plan_should_move_trains_without_initial_position_from_where_others_stop():
+    problem = build_problem()
+
+    # Act
+    plan = GreedyPlanner(problem=problem).plan()
+
+    # Assert
+    assert np.all(plan.sum(axis=(1, 2, 3)) > 0)
@@ -0,0 +1,22 @@
+import pytest
+from optimizer.instance_file import save_instance, load_instance
+from optimizer.model_cache import instance_fingerprint
+from tests.instances import build_instance
+
+
+@pytest.mark.parametrize("name", ["instance", "instance.npz"])
+def test_loaded_instance_should_match_the_saved_one(tmp_path, name):
+    instance = build_instance()
+
+    # Act
+    save_instance(tmp_path / name, **instance)
+    loaded = load_instance(tmp_path / name)
+
+    # Assert
+    assert instance_fingerprint(**loaded) == instance_fingerprint(**instance)
+    assert [d.minimum for d in loaded["demands"]] == [5e3, None]
+    assert loaded["demands"][0].flow.origin is loaded["demands"][1].flow.origin
+    assert [n.name for n in (loaded["demands"][0].flow.origin, loaded["demands"][0].flow.destination)] == \
+        ["terminal 1", "terminal 2"]
+    assert loaded["exchange_bands"][0].band == 4
+    assert loaded["trains"] == 2 and loaded["time_horizon"] == 30
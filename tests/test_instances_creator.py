@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from optimization_intances.instances_creator import build_nodes, build_flows, build_instance
+from optimizer.model_cache import instance_fingerprint
+
+
+def test_instances_should_be_reproducible_from_the_seed():
+    # Act
+    first = build_instance(terminals=20, trains=10, seed=7)
+    second = build_instance(terminals=20, trains=10, seed=7)
+    other = build_instance(terminals=20, trains=10, seed=8)
+
+    # Assert
+    assert instance_fingerprint(**first) == instance_fingerprint(**second)
+    assert instance_fingerprint(**first) != instance_fingerprint(**other)
+    assert len(first["demands"]) == 20 * 19
+    assert sum(d.flow.origin.initial_trains for d in first["demands"][::19]) == 10
+
+
+def test_sparse_instances_should_have_up_to_degree_destinations_by_origin():
+    # Act
+    instance = build_instance(terminals=200, trains=10, degree=3, seed=7)
+
+    # Assert
+    origins = np.array([d.flow.origin.identifier for d in instance["demands"]])
+    _, counts = np.unique(origins, return_counts=True)
+    assert counts.max() <= 3
+    assert all(d.flow.origin is not d.flow.destination for d in instance["demands"])
+    assert all(d.minimum <= d.maximum for d in instance["demands"])
+
+
+def test_a_single_terminal_should_have_no_flows():
+    nodes = build_nodes(amount=1, rng=np.random.default_rng(0))
+
+    # Act
+    flows = build_flows(nodes=nodes, degree=2, rng=np.random.default_rng(0))
+
+    # Assert
+    assert flows == []
+    with pytest.raises(ValueError, match="at least 2 terminals"):
+        build_instance(terminals=1, trains=1, degree=2)
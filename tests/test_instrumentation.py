@@ -0,0 +1,73 @@
+import threading
+import tracemalloc
+import numpy as np
+from optimizer.instrumentation import Profiler
+from optimizer.optimization_model import RailroadOptimizationProblem
+from optimizer.solvers.highs_backend import HighsBackend
+from tests.instances import build_instance
+
+
+def test_profiler_should_receive_every_phase():
+    profiler = Profiler()
+
+    # Act
+    problem = RailroadOptimizationProblem(**build_instance(), observer=profiler)
+    result = problem.optimize(max_time=60, backend=HighsBackend(verbose=False))
+    result.empty_offer()
+
+    # Assert
+    phases = [e.phase for e in profiler.events]
+    assert phases[:7] == [
+        "restrictions.capacity", "restrictions.exchange", "restrictions.time_horizon",
+        "restrictions.minimum_demand", "restrictions.maximum_demand", "restrictions.empty_offer",
+        "restrictions.dispatch_initial_trains"
+    ]
+    assert phases[7:] == ["model.assembly", "solve.build", "solve.run", "result.build", "report.empty_offer"]
+    assert profiler.events[7].details["nonzeros"] == problem.model_matrix.nonzeros
+    assert all(e.wall_time >= 0 and e.cpu_time >= 0 for e in profiler.events)
+    assert profiler.messages[0].startswith("Cardinality")
+
+
+def test_nested_phases_should_report_the_peak_of_their_children():
+    profiler = Profiler(trace_memory=True)
+
+    # Act
+    with profiler.phase("outer"):
+        with profiler.phase("inner"):
+            block = np.ones(2 ** 20)
+            del block
+
+    # Assert
+    inner, outer = profiler.events
+    assert inner.peak_memory >= 8 * 2 ** 20
+    assert outer.peak_memory >= inner.peak_memory
+
+
+def test_memory_should_be_traced_for_one_thread_at_a_time():
+    owner, other = Profiler(trace_memory=True), Profiler(trace_memory=True)
+    inside, other_done = threading.Event(), threading.Event()
+
+    def trace_in_other_thread():
+        inside.wait()
+        with other.phase("other"):
+            block = np.ones(2 ** 20)
+            del block
+        other_done.set()
+
+    thread = threading.Thread(target=trace_in_other_thread)
+    thread.start()
+
+    # Act
+    with owner.phase("owner"):
+        inside.set()
+        other_done.wait()
+        still_tracing = tracemalloc.is_tracing()
+        block = np.ones(2 ** 20)
+        del block
+    thread.join()
+
+    # Assert
+    assert still_tracing
+    assert not tracemalloc.is_tracing()
+    assert other.events[0].peak_memory == 0
+    assert owner.events[0].peak_memory >= 8 * 2 ** 20
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from optimizer.instrumentation import Observer, Profiler
+from optimizer.model_cache import ModelCache, instance_fingerprint
+from optimizer.optimization_model import RailroadOptimizationProblem, OptimizationMode
+from optimizer.solvers.highs_backend import HighsBackend
+from tests.instances import build_instance
+
+
+def test_fingerprint_should_not_depend_on_node_identifiers():
+    # Act
+    first = instance_fingerprint(**build_instance(), prune_variables=True)
+    second = instance_fingerprint(**build_instance(), prune_variables=True)
+
+    # Assert
+    assert first == second
+    assert first != instance_fingerprint(**build_instance(capacity=400e3), prune_variables=True)
+    assert first != instance_fingerprint(**build_instance(), prune_variables=False)
+
+
+def test_cached_model_should_match_the_built_one(tmp_path):
+    cache = ModelCache(tmp_path)
+
+    # Act
+    built = RailroadOptimizationProblem(**build_instance(), model_cache=cache, observer=Observer())
+    loaded = RailroadOptimizationProblem(**build_instance(), model_cache=cache, observer=Observer())
+
+    # Assert
+    assert cache.path(built.fingerprint).exists()
+    assert loaded.fingerprint == built.fingerprint
+    assert "capacity" not in vars(loaded)
+    assert (loaded.model_matrix.coefficients != built.model_matrix.coefficients).nnz == 0
+    assert np.array_equal(loaded.model_matrix.senses, built.model_matrix.senses)
+    assert np.array_equal(loaded.model_matrix.resources, built.model_matrix.resources)
+    assert np.array_equal(loaded.model_matrix.costs, built.model_matrix.costs)
+    assert np.array_equal(loaded.variable_index.positions, built.variable_index.positions)
+    assert np.array_equal(loaded.time_horizon.cycle_times, built.time_horizon.cycle_times)
+
+
+def test_cache_hit_should_build_the_families_once_when_first_read(tmp_path):
+    cache = ModelCache(tmp_path)
+    RailroadOptimizationProblem(**build_instance(), model_cache=cache, observer=Observer())
+    profiler = Profiler(trace_memory=False)
+    loaded = RailroadOptimizationProblem(**build_instance(), model_cache=cache, observer=profiler)
+    built_on_load = [e.phase for e in profiler.events if e.phase.startswith("restrictions.")]
+
+    # Act
+    capacity = loaded.capacity
+    cycle_times = loaded.time_horizon.cycle_times
+
+    # Assert
+    assert built_on_load == []
+    assert capacity is loaded.capacity
+    assert cycle_times.shape == loaded.structure.cardinality[1:]
+    assert len([e for e in profiler.events if e.phase == "restrictions.capacity"]) == 1
+    with pytest.raises(AttributeError):
+        loaded.capacty
+
+
+@pytest.mark.parametrize("aggregate_trains", [False, True])
+@pytest.mark.parametrize("mode", [OptimizationMode.EXACT, OptimizationMode.RELAX_AND_ROUND])
+def test_cache_hit_should_solve_without_building_the_families(tmp_path, aggregate_trains, mode):
+    cache = ModelCache(tmp_path)
+    built = RailroadOptimizationProblem(
+        **build_instance(), aggregate_trains=aggregate_trains, model_cache=cache, observer=Observer()
+    )
+    profiler = Profiler(trace_memory=False)
+
+    # Act
+    loaded = RailroadOptimizationProblem(
+        **build_instance(), aggregate_trains=aggregate_trains, model_cache=cache, observer=profiler
+    )
+    result = loaded.optimize(max_time=10, backend=HighsBackend(verbose=False), mode=mode)
+
+    # Assert
+    assert [e.phase for e in profiler.events if e.phase.startswith("restrictions.")] == []
+    assert result is not None
+    assert np.array_equal(result.cycle_times, built.time_horizon.cycle_times)
+    assert np.array_equal(result.transit_times, built.time_horizon.transit_matrix)
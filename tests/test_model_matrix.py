@@ -0,0 +1,34 @@
+import numpy as np
+from optimizer.model_matrix import ModelMatrix
+from optimizer.restrictions.capacity_restriction import CapacityRestrictions
+from optimizer.restrictions.railroad_elements import Node, Flow
+
+
+def test_model_matrix_should_stack_restrictions_as_sparse_rows():
+    n1 = Node(name='terminal 1', capacity=500)
+    n2 = Node(name='terminal 2', capacity=600)
+    flows = [
+        Flow(
+            origin=n1,
+            destination=n2,
+            train_volume=50
+        ),
+        Flow(
+            origin=n2,
+            destination=n1,
+            train_volume=60
+        )
+    ]
+    constraint = CapacityRestrictions(trains=1, flows=flows)
+
+    # Act
+    model = ModelMatrix.from_restrictions(
+        restrictions=constraint.restrictions(),
+        costs=np.ones(constraint.cardinality)
+    )
+
+    # Assert
+    np.testing.assert_allclose(model.coefficients.toarray(), constraint.coefficients_matrix)
+    np.testing.assert_allclose(model.resources, [500, 600])
+    np.testing.assert_array_equal(model.senses, ["<", "<"])
+    assert model.nonzeros == 4
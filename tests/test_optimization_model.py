@@ -1,3 +1,10 @@
+import pytest
+from optimization_intances.instances_creator import build_instance
+from optimizer.instrumentation import Observer
+from optimizer.optimization_model import RailroadOptimizationProblem
+from optimizer.solvers.highs_backend import HighsBackend
+
+
 def test_problem_should_have_2_capacity_constraints():
     ...
 
@@ -16,3 +23,25 @@ def test_problem_should_have_3_minimum_demand_constraints():
 
 def test_problem_time_horizon_restriction_should_have_coefficient_just_for_specific_train():
     ...
+
+
+def test_pruning_should_keep_the_optimum_of_a_sparse_network():
+    problems = {
+        options: RailroadOptimizationProblem(
+            **build_instance(terminals=3, trains=2, seed=0, degree=1),
+            prune_variables=options[0],
+            structural_pruning=options[1],
+            observer=Observer()
+        )
+        for options in [(False, False), (True, False), (True, True)]
+    }
+
+    # Act
+    for problem in problems.values():
+        problem.optimize(max_time=60, backend=HighsBackend(verbose=False))
+
+    # Assert
+    unpruned, pruned, structural = [p.outcome.objective for p in problems.values()]
+    assert pruned == pytest.approx(unpruned)
+    assert structural < unpruned
+    assert len(problems[True, True].variable_index) < len(problems[True, False].variable_index)
@@ -0,0 +1,87 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from optimizer.async_api import optimize_async, AsyncSolve
+from optimizer.instrumentation import Profiler
+from optimizer.optimization_model import OptimizationMode
+from optimizer.solvers.highs_backend import HighsBackend
+from optimizer.solvers.solver_backend import SolverStatus
+from tests.instances import build_problem
+
+
+def test_concurrent_solves_should_share_a_bounded_executor():
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    async def solve_all():
+        return await asyncio.gather(*[
+            optimize_async(build_problem, max_time=60, backend=HighsBackend(verbose=False), executor=executor)
+            for _ in range(3)
+        ])
+
+    # Act
+    results = asyncio.run(solve_all())
+
+    # Assert
+    assert all(result is not None for result in results)
+    assert len({result.optimization_result.sum() for result in results}) == 1
+
+
+def test_cancel_should_stop_the_solver_and_return_the_incumbent():
+    pytest.importorskip("gurobipy")
+    from optimizer.solvers.gurobi_backend import GurobiBackend
+    problem = build_problem()
+
+    async def solve():
+        solve = AsyncSolve(problem, max_time=60, backend=GurobiBackend(verbose=False))
+        solve.progress = lambda progress: progress.incumbent is not None and solve.cancel()
+        return await solve
+
+    # Act
+    result = asyncio.run(solve())
+
+    # Assert
+    assert result is not None
+    assert problem.outcome.status == SolverStatus.INTERRUPTED
+
+
+def test_cancelled_task_should_raise_after_the_solve_returns():
+    problem = build_problem()
+
+    async def wait(solve):
+        return await solve
+
+    async def solve():
+        solve = AsyncSolve(problem, max_time=60, backend=HighsBackend(verbose=False))
+        task = asyncio.create_task(wait(solve))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return solve
+
+    # Act
+    solve = asyncio.run(solve())
+
+    # Assert
+    assert solve.cancelled
+    assert problem.outcome is not None
+
+
+def test_cancel_should_stop_the_column_generation_pricing():
+    problem = build_problem(observer=Profiler(trace_memory=False))
+
+    async def solve():
+        solve = AsyncSolve(
+            problem, max_time=60, backend=HighsBackend(verbose=False), mode=OptimizationMode.COLUMN_GENERATION
+        )
+        solve.progress = lambda progress: solve.cancel()
+        return await solve
+
+    # Act
+    result = asyncio.run(solve())
+
+    # Assert
+    phase = next(e for e in problem.observer.events if e.phase == "solve.column_generation")
+    assert phase.details["iterations"] == 1
+    assert problem.outcome.status == SolverStatus.INTERRUPTED
+    assert result is not None
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from optimizer.progress import ProgressStream
+from optimizer.solvers.highs_backend import HighsBackend
+from tests.instances import build_problem
+
+
+def build_backend(backend_name):
+    if backend_name == "gurobi":
+        pytest.importorskip("gurobipy")
+        from optimizer.solvers.gurobi_backend import GurobiBackend
+        return GurobiBackend(verbose=False)
+    return HighsBackend(verbose=False)
+
+
+@pytest.mark.parametrize("backend_name", ["highs", "gurobi"])
+def test_progress_callback_should_receive_the_incumbent_and_bound(backend_name):
+    problem = build_problem()
+    events = []
+
+    # Act
+    problem.optimize(max_time=60, backend=build_backend(backend_name), progress=events.append)
+
+    # Assert
+    assert events
+    last = events[-1]
+    assert last.incumbent == pytest.approx(problem.outcome.objective)
+    assert last.bound >= last.incumbent - 1e-6
+    assert last.gap is not None and last.elapsed >= 0
+
+
+def test_progress_callback_should_stop_the_solve():
+    pytest.importorskip("gurobipy")
+    from optimizer.solvers.gurobi_backend import GurobiBackend
+    problem = build_problem()
+    events = []
+
+    def stop_at_first_incumbent(progress):
+        events.append(progress)
+        return progress.incumbent is not None
+
+    # Act
+    result = problem.optimize(max_time=60, backend=GurobiBackend(verbose=False), progress=stop_at_first_incumbent)
+
+    # Assert
+    assert result is not None
+    assert events[-1].incumbent is not None
+    assert [e for e in events if e.incumbent is not None] == events[-1:]
+
+
+def test_progress_stream_should_iterate_the_events_of_a_solve():
+    problem = build_problem()
+
+    async def follow():
+        stream = ProgressStream(stop_gap=0.5)
+        solve = asyncio.create_task(stream.run(problem.optimize, max_time=60, backend=HighsBackend(verbose=False)))
+        events = [progress async for progress in stream]
+        return events, await solve
+
+    # Act
+    events, result = asyncio.run(follow())
+
+    # Assert
+    assert result is not None
+    assert events and events[-1].incumbent == pytest.approx(problem.outcome.objective)
+
+
+def test_gurobi_callback_should_read_a_stop_request_on_a_plateau():
+    gp = pytest.importorskip("gurobipy")
+    from optimizer.solvers.gurobi_backend import GurobiBackend
+    codes = gp.GRB.Callback
+
+    class PlateauModel:
+        runtime = 0.0
+        terminated = False
+
+        def cbGet(self, what):
+            values = {codes.MIP_OBJBST: 10.0, codes.MIP_OBJBND: 12.0, codes.MIP_NODCNT: 5.0}
+            return self.runtime if what == codes.RUNTIME else values[what]
+
+        def terminate(self):
+            self.terminated = True
+
+    stop = [False]
+    events = []
+
+    def progress(snapshot):
+        events.append(snapshot)
+        return stop[0]
+
+    model = PlateauModel()
+    callback = GurobiBackend._GurobiBackend__callback(progress, interval=1.0)
+
+    # Act
+    callback(model, codes.MIP)
+    stop[0] = True
+    model.runtime = 0.5
+    callback(model, codes.MIP)
+    stopped_early = model.terminated
+    model.runtime = 1.5
+    callback(model, codes.MIP)
+
+    # Assert
+    assert len(events) == 2
+    assert not stopped_early
+    assert model.terminated
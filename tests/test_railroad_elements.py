@@ -0,0 +1,85 @@
+import numpy as np
+from optimizer.restrictions.capacity_restriction import CapacityRestrictions
+from optimizer.restrictions.empty_offer_restriction import EmptyOfferRestriction
+from optimizer.restrictions.railroad_elements import (
+    Node, Flow, TransitTime, RailroadProblemTemplate, ProblemStructure
+)
+
+
+def test_feasible_variables_should_require_flow_and_known_empty_return():
+    n1 = Node(name='terminal 1', capacity=500)
+    n2 = Node(name='terminal 2', capacity=600)
+    n3 = Node(name='terminal 3', capacity=600)
+    flows = [
+        Flow(origin=n1, destination=n2, train_volume=50),
+        Flow(origin=n2, destination=n3, train_volume=60),
+    ]
+    transit_times = [
+        TransitTime(origin=n1, destination=n2, time=20),
+        TransitTime(origin=n2, destination=n3, time=30),
+    ]
+    template = RailroadProblemTemplate(trains=1, flows=flows)
+
+    # Act
+    actual = template.feasible_variables(transit_times=transit_times)
+
+    # Assert: U = [n2, n3], L = [n1, n2]
+    expected = np.zeros((1, 2, 2, 2), dtype=bool)
+    expected[0, 0, 0, 0] = True     # n2 -> n1 (known n1->n2 transit) loading n1->n2
+    expected[0, 0, 1, 1] = True     # train already in n2 loading n2->n3
+    expected[0, 1, 1, 1] = True     # n3 -> n2 (known n2->n3 transit) loading n2->n3
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_position_tables_should_map_node_identifiers_to_each_role_position():
+    n1 = Node(name='terminal 1', capacity=500)
+    n2 = Node(name='terminal 2', capacity=600)
+    n3 = Node(name='terminal 3', capacity=600)
+    flows = [
+        Flow(origin=n1, destination=n3, train_volume=50),
+        Flow(origin=n2, destination=n3, train_volume=60),
+    ]
+
+    template = RailroadProblemTemplate(trains=1, flows=flows)
+
+    assert template.loaded_origin_positions == {n1.identifier: 0, n2.identifier: 1}
+    assert template.loaded_destination_positions == {n3.identifier: 0}
+    assert template.empty_origin_positions == {n3.identifier: 0}
+
+
+def test_restriction_families_should_share_the_given_structure():
+    n1 = Node(name='terminal 1', capacity=500)
+    n2 = Node(name='terminal 2', capacity=600)
+    flows = [Flow(origin=n1, destination=n2, train_volume=50)]
+    structure = ProblemStructure(trains=2, flows=flows)
+
+    capacity = CapacityRestrictions(trains=2, flows=flows, structure=structure)
+    empty_offer = EmptyOfferRestriction(trains=2, flows=flows, structure=structure)
+
+    assert capacity.structure is empty_offer.structure is structure
+    assert capacity.cardinality == (2, 1, 1, 1)
+    np.testing.assert_array_equal(structure.flow_volumes, [50])
+    assert not structure.flow_volumes.flags.writeable
+
+
+def test_fitting_variables_should_drop_trips_longer_than_the_time_horizon():
+    n1 = Node(name='terminal 1', capacity=500)
+    n2 = Node(name='terminal 2', capacity=600)
+    flows = [
+        Flow(origin=n1, destination=n2, train_volume=50),
+        Flow(origin=n2, destination=n1, train_volume=60),
+    ]
+    transit_times = [
+        TransitTime(origin=n1, destination=n2, time=20),
+        TransitTime(origin=n2, destination=n1, time=5),
+    ]
+    template = RailroadProblemTemplate(trains=1, flows=flows)
+
+    # Act
+    actual = template.fitting_variables(transit_times=transit_times, time_horizon=30)
+
+    # Assert: U = L = [n1, n2]
+    assert not actual[0, 1, 0, 1]      # n2 -> n1 timed by the n1->n2 transit, loading n1->n2: 40
+    assert actual[0, 0, 0, 1]          # train already in n1 loading n1->n2: 20
+    assert actual[0, 0, 1, 0]          # n1 -> n2 timed by the n2->n1 transit, loading n2->n1: 10
+    assert actual.sum() == 7
@@ -0,0 +1,30 @@
+import numpy as np
+from optimizer.restrictions.restrictions import Restriction
+
+
+def test_restriction_should_sum_repeated_positions_and_drop_zeros():
+    restriction = Restriction(
+        indices=np.array([3, 1, 3, 2, 2]),
+        values=np.array([1, 5, 1, 1, -1]),
+        sense="<",
+        resource=10,
+        shape=(2, 2)
+    )
+
+    np.testing.assert_array_equal(restriction.indices, [1, 3])
+    np.testing.assert_allclose(restriction.values, [5, 2])
+
+
+def test_dense_coefficients_should_be_built_from_sparse_entries():
+    dense = np.array([
+        [0, 50],
+        [60, 0]
+    ])
+    restriction = Restriction.from_dense(coefficients=dense, sense="<", resource=10)
+
+    # Act
+    actual = restriction.coefficients
+
+    # Assert
+    np.testing.assert_allclose(actual, dense)
+    np.testing.assert_allclose(restriction.to_vector(), [0, 50, 60, 0])
@@ -0,0 +1,69 @@
+import numpy as np
+from optimizer.optimization_model import RailroadResult
+from optimizer.restrictions.railroad_elements import Node, Flow, Demand
+from optimizer.sparse_plan import SparsePlan
+
+
+def build_result():
+    a = Node(name="a", capacity=100)
+    b = Node(name="b", capacity=100)
+    c = Node(name="c", capacity=100)
+    demands = [
+        Demand(flow=Flow(origin=a, destination=b, train_volume=10), minimum=0, maximum=50),
+        Demand(flow=Flow(origin=b, destination=c, train_volume=20), minimum=None, maximum=80),
+        Demand(flow=Flow(origin=a, destination=c, train_volume=30), minimum=10, maximum=90),
+    ]
+    # (trains, U, L, U): unload points b, c - load points a, b
+    plan = np.zeros((2, 2, 2, 2))
+    plan[0, 0, 0, 0] = 2        # b -> a -> b
+    plan[0, 1, 1, 1] = 1        # c -> b -> c
+    plan[1, 1, 0, 1] = 3        # c -> a -> c
+    transit_times = np.array([[1., 2.], [0., 4.]])
+    return RailroadResult(
+        plan=SparsePlan.from_dense(plan),
+        load_terminals=[a, b],
+        unload_terminals=[b, c],
+        demand=demands,
+        transit_times=transit_times
+    )
+
+
+def test_accepted_volume_should_be_computed_by_flow():
+    result = build_result()
+
+    # Act
+    report = result.accpt_volume(verbose=False)
+
+    # Assert
+    assert list(report.columns) == [
+        "origin", "destination", "demand max", "demand minimum", "accept volume", "travels", "flow"
+    ]
+    assert report["travels"].tolist() == [2, 1, 3]
+    assert report["accept volume"].tolist() == [20, 20, 90]
+    assert report["flow"].tolist() == ["0|0", "1|1", "0|1"]
+    assert report["demand minimum"].isna().tolist() == [False, True, False]
+
+
+def test_empty_offer_should_list_every_unload_and_load_pair():
+    result = build_result()
+
+    # Act
+    report = result.empty_offer()
+
+    # Assert
+    assert [(o.name, d.name) for o, d in zip(report["origin"], report["destination"])] == [
+        ("b", "a"), ("b", "b"), ("c", "a"), ("c", "b")
+    ]
+    assert report["travels"].tolist() == [2, 0, 3, 1]
+
+
+def test_aggregates_should_be_computed_once():
+    result = build_result()
+
+    # Act
+    utilization = result.train_utilization(total_time=10)
+
+    # Assert
+    assert np.allclose(utilization, [(2 * 1 + 1 * 4) / 10, 3 * 2 / 10])
+    assert result.time_by_train is result.time_by_train
+    assert result.flow_travels is result.flow_travels
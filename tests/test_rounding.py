@@ -0,0 +1,83 @@
+import time
+import numpy as np
+import pytest
+from optimization_intances.instances_creator import build_instance
+from optimizer.instrumentation import Observer
+from optimizer.optimization_model import RailroadOptimizationProblem, OptimizationMode
+from optimizer.rounding import RelaxAndRound
+from optimizer.solvers.highs_backend import HighsBackend
+from optimizer.solvers.solver_backend import SolverStatus
+from tests.instances import build_problem
+
+
+@pytest.mark.parametrize("aggregate_trains", [False, True])
+def test_rounded_relaxation_should_satisfy_every_restriction(aggregate_trains):
+    problem = build_problem(aggregate_trains=aggregate_trains)
+    backend = HighsBackend(verbose=False)
+    relaxed = backend.relax(backend.build(problem.model_matrix), max_time=60)
+    rounding = RelaxAndRound(model=problem.model_matrix)
+
+    # Act
+    values = rounding.round(relaxed.values)
+
+    # Assert
+    assert np.array_equal(values, np.round(values))
+    assert rounding.is_feasible(values)
+    assert problem.model_matrix.costs @ values <= relaxed.objective + 1e-6
+
+
+def test_rounding_should_take_less_time_than_the_relaxation():
+    problem = RailroadOptimizationProblem(**build_instance(terminals=6, trains=10, seed=3), observer=Observer())
+    backend = HighsBackend(verbose=False)
+    relaxed = backend.relax(backend.build(problem.model_matrix), max_time=60)
+    rounding = RelaxAndRound(model=problem.model_matrix)
+    begin = time.perf_counter()
+
+    # Act
+    values = rounding.round(relaxed.values)
+
+    # Assert
+    assert time.perf_counter() - begin < relaxed.solve_time
+    assert rounding.is_feasible(values)
+
+
+def test_rounding_should_repair_violated_rows():
+    problem = build_problem()
+    rounding = RelaxAndRound(model=problem.model_matrix)
+    values = np.full(problem.model_matrix.variables, 3.0)
+    assert not rounding.is_feasible(values)
+
+    # Act
+    repaired = rounding.round(values)
+
+    # Assert
+    assert rounding.is_feasible(repaired)
+
+
+def test_relax_and_round_mode_should_report_bound_and_gap():
+    problem = build_problem()
+
+    # Act
+    result = problem.optimize(max_time=60, backend=HighsBackend(verbose=False), mode=OptimizationMode.RELAX_AND_ROUND)
+    exact = build_problem().optimize(max_time=60, backend=HighsBackend(verbose=False))
+
+    # Assert
+    outcome = problem.outcome
+    assert outcome.status == SolverStatus.FEASIBLE
+    assert result is not None
+    assert outcome.objective <= outcome.bound + 1e-6
+    assert 0 <= outcome.gap < 1
+    assert exact is not None
+
+
+def test_relax_and_round_mode_should_not_claim_infeasibility_without_a_plan(monkeypatch):
+    monkeypatch.setattr(RelaxAndRound, "is_feasible", lambda self, values: False)
+    problem = build_problem()
+
+    # Act
+    result = problem.optimize(max_time=60, backend=HighsBackend(verbose=False), mode=OptimizationMode.RELAX_AND_ROUND)
+
+    # Assert
+    assert result is None
+    assert problem.outcome.status == SolverStatus.NO_SOLUTION
+    assert problem.outcome.bound is not None
@@ -0,0 +1,16 @@
+import json
+from benchmarks.scaling import BenchmarkCase, run_case, write_records
+
+
+def test_benchmark_should_record_every_phase(tmp_path):
+    # Act
+    record = run_case(BenchmarkCase(nodes=4, trains=3, density=0.5), max_time=10)
+    write_records([record], tmp_path / "scaling.json")
+
+    # Assert
+    assert record.nonzeros > 0 and record.variables > 0
+    assert record.restriction_build_time > 0 and record.assembly_time > 0
+    assert record.restriction_build_memory > 0
+    assert record.status == "optimal" and record.report_time > 0
+    rows = json.loads((tmp_path / "scaling.json").read_text())
+    assert rows[0]["nonzeros"] == record.nonzeros
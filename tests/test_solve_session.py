@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from optimizer.instrumentation import Observer
+from optimizer.optimization_model import RailroadOptimizationProblem
+from optimizer.solve_session import SolveSession
+from optimizer.solvers.highs_backend import HighsBackend
+from tests.instances import build_instance
+
+
+def build_backend(backend_name):
+    if backend_name == "gurobi":
+        pytest.importorskip("gurobipy")
+        from optimizer.solvers.gurobi_backend import GurobiBackend
+        return GurobiBackend(verbose=False)
+    return HighsBackend(verbose=False)
+
+
+@pytest.mark.parametrize("backend_name", ["highs", "gurobi"])
+def test_session_should_follow_changed_demands_and_bands(backend_name):
+    backend = build_backend(backend_name)
+    instance = build_instance(minimum=4e3, band=20)
+    problem = RailroadOptimizationProblem(**instance, observer=Observer())
+    session = SolveSession(problem=problem, backend=backend)
+    first = session.solve(max_time=10)
+
+    # Act
+    instance["demands"][0].maximum = 20e3
+    instance["exchange_bands"][0].band = 3
+    second = session.solve(max_time=10)
+
+    # Assert
+    assert first.accpt_volume(verbose=False)["accept volume"][0] == pytest.approx(45e3)
+    travels = np.sum(second.optimization_result, axis=(0, 1))
+    assert travels[0, 0] == 3
+    fresh = SolveSession(
+        problem=RailroadOptimizationProblem(**build_instance(minimum=4e3, band=20), observer=Observer()),
+        backend=backend
+    )
+    fresh.problem.demand[0].maximum = 20e3
+    fresh.problem.exchange_bands[0].band = 3
+    fresh.problem.build_restrictions()
+    fresh.solve(max_time=10)
+    assert session.outcome.objective == pytest.approx(fresh.outcome.objective)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from optimizer.model_matrix import ModelMatrix
+from optimizer.solvers.highs_backend import HighsBackend
+from optimizer.solvers.solver_backend import SolverStatus
+
+
+def build_model():
+    # maximize 3x + 2y  s.t.  x + y <= 4.5 ; x <= 2.5 ; y >= 1
+    return ModelMatrix(
+        coefficients=sparse.csr_matrix(np.array([
+            [1, 1],
+            [1, 0],
+            [0, 1]
+        ])),
+        senses=np.array(["<", "<", ">"]),
+        resources=np.array([4.5, 2.5, 1]),
+        costs=np.array([3, 2]),
+        shape=(2,)
+    )
+
+
+def test_highs_backend_should_find_integer_optimum():
+    outcome = HighsBackend(verbose=False).solve(model=build_model(), max_time=10)
+
+    assert outcome.status == SolverStatus.OPTIMAL
+    np.testing.assert_allclose(outcome.values, [2, 2])
+    assert outcome.objective == pytest.approx(10)
+
+
+def test_gurobi_backend_should_agree_with_highs_backend():
+    pytest.importorskip("gurobipy")
+    from optimizer.solvers.gurobi_backend import GurobiBackend
+
+    outcome = GurobiBackend(verbose=False).solve(model=build_model(), max_time=10)
+
+    assert outcome.status == SolverStatus.OPTIMAL
+    np.testing.assert_allclose(outcome.values, [2, 2])
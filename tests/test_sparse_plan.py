@@ -0,0 +1,45 @@
+import numpy as np
+from optimizer.sparse_plan import SparsePlan
+from optimizer.variable_index import VariableIndex
+
+
+def build_tensor():
+    rng = np.random.default_rng(3)
+    tensor = rng.integers(0, 3, size=(4, 2, 3, 2)) * (rng.random((4, 2, 3, 2)) < .3)
+    return tensor.astype(float)
+
+
+def test_sparse_plan_should_keep_only_the_nonzero_entries():
+    tensor = build_tensor()
+
+    # Act
+    plan = SparsePlan.from_dense(tensor)
+
+    # Assert
+    assert len(plan) == np.count_nonzero(tensor)
+    assert np.all(plan.values != 0)
+    assert np.array_equal(plan.to_dense(), tensor)
+    assert np.array_equal(tensor[tuple(plan.labels().T)], plan.values)
+
+
+def test_sparse_plan_from_columns_should_place_the_values_of_the_model_columns():
+    index = VariableIndex(shape=(2, 1, 2, 2), positions=np.array([1, 2, 5, 7]))
+
+    # Act
+    plan = SparsePlan.from_columns(index=index, values=np.array([0., 2., 0., 1.]))
+
+    # Assert
+    assert plan.positions.tolist() == [2, 7]
+    assert np.array_equal(plan.to_dense(), index.expand(np.array([0., 2., 0., 1.])))
+
+
+def test_reduce_should_match_the_dense_sums():
+    tensor = build_tensor()
+    weights = np.arange(6, dtype=float).reshape(3, 2)
+    plan = SparsePlan.from_dense(tensor)
+
+    # Act & Assert
+    assert np.array_equal(plan.reduce(keep=(2, 3)), tensor.sum(axis=(0, 1)))
+    assert np.array_equal(plan.reduce(keep=(1, 2)), tensor.sum(axis=(0, 3)))
+    assert np.array_equal(plan.reduce(keep=(0,)), tensor.sum(axis=(1, 2, 3)))
+    assert np.allclose(plan.reduce(keep=(0,), weights=weights), (tensor * weights).sum(axis=(1, 2, 3)))
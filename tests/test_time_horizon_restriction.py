@@ -42,3 +42,34 @@ def test_restriction_vector_for_one_origin_and_two_destinations_and_two_trains()
     expected = np.array(expected)
 
     np.testing.assert_allclose(actual, expected)
+
+
+def test_cycle_time_table_should_add_empty_return_and_loaded_trip():
+    n1 = Node(name='terminal 1', capacity=500)
+    n2 = Node(name='terminal 2', capacity=600)
+    n3 = Node(name='terminal 3', capacity=600)
+    flows = [
+        Flow(
+            origin=n1,
+            destination=n2,
+            train_volume=50
+        ),
+        Flow(
+            origin=n1,
+            destination=n3,
+            train_volume=60
+        )
+    ]
+    transit_times = [
+        TransitTime(origin=n1, destination=n2, time=20),
+        TransitTime(origin=n1, destination=n3, time=30),
+    ]
+    constraint = TimeHorizonRestriction(trains=2, flows=flows, transit_times=transit_times, time_horizon=90)
+
+    # Act
+    table = constraint.cycle_table
+
+    # Assert
+    np.testing.assert_allclose(table.loaded, [[27.5, 39]])          # transit + volume / (600 / 90)
+    np.testing.assert_allclose(table.empty_return, [[29, 40.8]])    # transit + volume / (500 / 90)
+    np.testing.assert_allclose(constraint.restrictions()[1].to_vector()[4:], table.cycle_times.ravel())
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from optimization_intances.instances_creator import build_instance
+from optimizer.instrumentation import Observer
+from optimizer.optimization_model import RailroadOptimizationProblem
+from optimizer.restrictions.railroad_elements import Node
+from optimizer.solvers.highs_backend import HighsBackend
+from optimizer.train_classes import build_train_classes, disaggregate, rebalance
+
+
+def test_trains_should_be_grouped_by_initial_position():
+    n1 = Node(name='terminal 1', capacity=500, initial_trains=2)
+    n2 = Node(name='terminal 2', capacity=600)
+    n3 = Node(name='terminal 3', capacity=600, initial_trains=1)
+
+    # Act
+    classes = build_train_classes(trains=5, empty_origins=[n1, n2, n3])
+
+    # Assert
+    assert [c.start for c in classes] == [n1, n3, None]
+    assert [c.trains for c in classes] == [[0, 1], [2], [3, 4]]
+
+
+def test_disaggregate_should_keep_trips_and_dispatch_each_train_from_its_start():
+    n1 = Node(name='terminal 1', capacity=500, initial_trains=2)
+    n2 = Node(name='terminal 2', capacity=600)
+    classes = build_train_classes(trains=2, empty_origins=[n1, n2])
+    solution = np.zeros((1, 2, 1, 2))
+    solution[0, 0, 0, 1] = 2     # two trips departing from n1
+    solution[0, 1, 0, 1] = 4
+    cycle_times = np.ones((2, 1, 2))
+
+    # Act
+    actual = disaggregate(solution=solution, classes=classes, empty_origins=[n1, n2], cycle_times=cycle_times)
+
+    # Assert
+    np.testing.assert_allclose(actual.sum(axis=0), solution[0])
+    np.testing.assert_allclose(actual[:, 0].sum(axis=(1, 2)), [1, 1])
+    np.testing.assert_allclose(actual.sum(axis=(1, 2, 3)), [3, 3])
+
+
+def test_disaggregate_should_keep_every_train_within_the_time_horizon():
+    n1 = Node(name='terminal 1', capacity=500)
+    n2 = Node(name='terminal 2', capacity=600)
+    classes = build_train_classes(trains=2, empty_origins=[n1, n2])
+    solution = np.zeros((1, 2, 1, 2))
+    solution[0, 0, 0, 0] = 2     # longest cycle first to the least used train leaves 3 + 2 + 2 and 3 + 2
+    solution[0, 1, 0, 1] = 3
+    cycle_times = np.array([[[3., 1.]], [[1., 2.]]])
+
+    # Act
+    actual = disaggregate(
+        solution=solution, classes=classes, empty_origins=[n1, n2], cycle_times=cycle_times, time_horizon=6
+    )
+
+    # Assert
+    np.testing.assert_allclose(actual.sum(axis=0), solution[0])
+    np.testing.assert_allclose(np.tensordot(actual, cycle_times, axes=3), [6, 6])
+
+
+def test_rebalance_should_report_the_trains_it_can_not_fit():
+    plan = np.zeros((2, 1, 1, 1))
+    plan[:, 0, 0, 0] = [3, 1]
+    cycle_times = np.full((1, 1, 1), 4.)
+
+    # Act
+    overloaded = rebalance(plan=plan, starts=np.array([-1, -1]), cycle_times=cycle_times, time_horizon=6)
+
+    # Assert
+    assert overloaded.tolist() == [0]
+    np.testing.assert_allclose(plan[:, 0, 0, 0], [3, 1])
+
+
+@pytest.mark.parametrize("seed", [0, 2])
+def test_aggregated_result_should_tell_when_a_train_exceeds_the_time_horizon(seed):
+    problem = RailroadOptimizationProblem(
+        **build_instance(terminals=3, trains=3, seed=seed), aggregate_trains=True, observer=Observer()
+    )
+
+    # Act
+    result = problem.optimize(max_time=60, backend=HighsBackend(verbose=False))
+
+    # Assert
+    overloaded = np.any(result.train_utilization(total_time=problem.horizon) > 1 + 1e-9)
+    assert result.needs_repair == overloaded
+    assert result.needs_repair == (seed == 0)
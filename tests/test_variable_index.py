@@ -0,0 +1,26 @@
+import numpy as np
+from optimizer.variable_index import VariableIndex
+
+
+def test_labels_and_columns_should_round_trip():
+    index = VariableIndex(shape=(2, 2, 1, 2), positions=np.array([1, 2, 5, 7]))
+
+    # Act
+    labels = index.to_labels()
+
+    # Assert
+    np.testing.assert_array_equal(labels, [
+        [0, 0, 0, 1],
+        [0, 1, 0, 0],
+        [1, 0, 0, 1],
+        [1, 1, 0, 1],
+    ])
+    np.testing.assert_array_equal(index.from_labels(labels), [0, 1, 2, 3])
+
+
+def test_labels_outside_the_model_should_map_to_minus_one():
+    index = VariableIndex(shape=(2, 2, 1, 2), positions=np.array([1, 2, 5, 7]))
+
+    actual = index.from_labels([[0, 0, 0, 0], [1, 1, 0, 1]])
+
+    np.testing.assert_array_equal(actual, [-1, 3])